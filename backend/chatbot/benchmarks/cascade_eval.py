@@ -0,0 +1,108 @@
+"""
+Offline evaluation of the model cascade.
+
+Run from backend/chatbot:
+    python -m benchmarks.cascade_eval [--queries labeled.jsonl] [--show]
+
+Sends a labeled query set through the real QA and relevance chains with
+stub LLMs (benchmarks.fakes) that record which tier served each request.
+Each JSONL line is {"message": "...", "history": "...", "expected": "small"|"large"}.
+Without --queries a built-in set is used. Reports the share served by each
+tier, routing accuracy against the labels (under-escalation is the costly
+error) and the stub latency of cascade vs. large-only.
+"""
+import json
+import time
+import argparse
+
+from benchmarks import fakes
+
+LABELED_QUERIES = [
+    {"message": "hi", "expected": "small"},
+    {"message": "thank you, that helps", "expected": "small"},
+    {"message": "good morning!", "expected": "small"},
+    {"message": "can you suggest a quick breathing exercise?", "expected": "small"},
+    {"message": "what should I do to relax before bed", "expected": "small"},
+    {"message": "I want to die, nothing matters anymore", "expected": "large"},
+    {"message": "I have been thinking about suicide lately", "expected": "large"},
+    {"message": "I feel hopeless and worthless and I can't sleep, I'm exhausted all the time", "expected": "large"},
+    {"message": "What are the symptoms of depression and how is it treated?", "expected": "large"},
+    {"message": " ".join(["I have a long story about my week at college and my family."] * 6), "expected": "large"},
+    {"message": "I'm anxious and worried about my exams and I panic every night", "expected": "large"},
+    {"message": "ok", "expected": "small"},
+]
+
+
+def load_queries(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries")
+    parser.add_argument("--show", action="store_true", help="print every routing decision")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries) if args.queries else LABELED_QUERIES
+    installed = fakes.install()
+    served_by = {installed["llm"].model_name: "large", installed["small_llm"].model_name: "small"}
+
+    import chatbot_apis
+    import model_router
+
+    qa = chatbot_apis.get_qa_chain()
+    relevance = chatbot_apis.get_relevance_chain()
+
+    rows, tiers = [], {"small": 0, "large": 0}
+    confusion = {"correct": 0, "under_escalated": 0, "over_escalated": 0}
+    cascade_seconds = 0.0
+    for q in queries:
+        start = time.perf_counter()
+        reply = qa.invoke({"query": q["message"], "history": q.get("history", "")})
+        cascade_seconds += time.perf_counter() - start
+        # The stub prefixes its reply with the model that produced it
+        tier = served_by[reply[1:reply.index("]")]]
+        tiers[tier] += 1
+        expected = q.get("expected")
+        if expected:
+            if tier == expected:
+                confusion["correct"] += 1
+            elif expected == "large":
+                confusion["under_escalated"] += 1
+            else:
+                confusion["over_escalated"] += 1
+        rows.append({"message": q["message"][:60], "expected": expected, "tier": tier})
+
+    calls_before = installed["small_llm"].calls
+    for q in queries:
+        relevance.invoke({"text": q["message"]})
+    relevance_small = installed["small_llm"].calls - calls_before
+
+    # Large-only baseline: same queries with routing switched off
+    model_router.ROUTER_ENABLED = False
+    start = time.perf_counter()
+    for q in queries:
+        qa.invoke({"query": q["message"], "history": q.get("history", "")})
+    large_only_seconds = time.perf_counter() - start
+    model_router.ROUTER_ENABLED = True
+
+    labeled = sum(1 for q in queries if q.get("expected"))
+    results = {
+        "queries": len(queries),
+        "chat_tiers": tiers,
+        "small_share": round(tiers["small"] / len(queries), 4),
+        "relevance_served_by_small": relevance_small,
+        "routing_accuracy": round(confusion["correct"] / labeled, 4) if labeled else None,
+        "confusion": confusion,
+        "cascade_mean_ms": round(cascade_seconds / len(queries) * 1000, 2),
+        "large_only_mean_ms": round(large_only_seconds / len(queries) * 1000, 2),
+        "route_stats": model_router.route_stats(),
+    }
+    if args.show:
+        results["decisions"] = rows
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
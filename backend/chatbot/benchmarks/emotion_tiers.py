@@ -0,0 +1,110 @@
+"""
+Compares the tiered emotion detector with the model-only path.
+
+Run from backend/chatbot:
+    python -m benchmarks.emotion_tiers [conversation.json | conversations.jsonl ...]
+
+Inputs are conversation files in the conversation.json role/content format,
+or JSONL with one conversation (list of messages) or message per line. With
+no arguments a built-in set of sample user messages is used. Reports how often
+each tier answered, agreement with the model on the lexicon-answered messages
+and per-tier latency.
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+
+from emotion_detector import classify_lexicon, MIN_CONFIDENCE
+
+SAMPLE_MESSAGES = [
+    "I feel so lonely and hopeless these days",
+    "I'm anxious about my exams and can't stop worrying",
+    "I am so angry at my roommate, I hate this",
+    "Today was a great day, I feel good and grateful",
+    "I can't sleep and I feel exhausted every day",
+    "I'm not happy with how things are going",
+    "My friend suddenly moved away, I'm shocked",
+    "what time does the library open",
+    "I keep having panic attacks before class",
+    "I feel worthless and full of shame",
+    "I'm excited about the trip but also a bit nervous",
+    "sick of everything, it's disgusting how people behave",
+    "I don't feel sad anymore, just tired",
+    "I'm proud of myself for finishing the project",
+    "thoughts of death keep coming back",
+]
+
+
+def load_messages(paths):
+    messages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                records = [json.load(f)]
+        for record in records:
+            msgs = record if isinstance(record, list) else [record]
+            messages.extend(m["content"] for m in msgs
+                            if isinstance(m, dict) and m.get("role") == "user" and m.get("content"))
+    return messages
+
+
+def pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(int(q / 100 * len(values)), len(values) - 1)] * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--show", action="store_true", help="print every disagreement")
+    args = parser.parse_args()
+
+    messages = load_messages(args.paths) if args.paths else SAMPLE_MESSAGES
+    if not messages:
+        sys.exit("No user messages found.")
+
+    from video_recommender import detect_emotion_model
+
+    lexicon_times, model_times = [], []
+    answered, agree, disagreements = 0, 0, []
+    for text in messages:
+        start = time.perf_counter()
+        label, confidence = classify_lexicon(text)
+        lexicon_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        model_label = detect_emotion_model(text)
+        model_times.append(time.perf_counter() - start)
+
+        if label and confidence >= MIN_CONFIDENCE:
+            answered += 1
+            if label == model_label:
+                agree += 1
+            else:
+                disagreements.append({"text": text, "lexicon": label, "model": model_label})
+
+    results = {
+        "messages": len(messages),
+        "lexicon_answered": answered,
+        "lexicon_share": round(answered / len(messages), 4),
+        "agreement_on_lexicon_answers": round(agree / answered, 4) if answered else None,
+        "lexicon_ms": {"p50": pct(lexicon_times, 50), "p95": pct(lexicon_times, 95)},
+        "model_ms": {"p50": pct(model_times, 50), "p95": pct(model_times, 95)},
+        "tiered_mean_ms": round(
+            (statistics.mean(lexicon_times)
+             + (len(messages) - answered) / len(messages) * statistics.mean(model_times)) * 1000, 3),
+        "model_only_mean_ms": round(statistics.mean(model_times) * 1000, 3),
+    }
+    if args.show:
+        results["disagreements"] = disagreements
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Local stand-in for the Groq chat completions API that enforces its own
+requests-per-minute limit (a continuously refilling bucket) and answers 429
+with retry-after beyond it, the way the real provider does under peak load.
+
+Standalone:
+    python -m benchmarks.fake_groq --port 8900 --rpm 60
+    GROQ_API_BASE=http://127.0.0.1:8900 GROQ_API_KEY=fake python chatbot_apis.py
+"""
+import json
+import time
+import argparse
+from threading import Lock, Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGroq:
+    def __init__(self, rpm=60, latency=0.2):
+        self.rpm = rpm
+        self.latency = latency
+        self._lock = Lock()
+        self._tokens = float(rpm)
+        self._updated = time.monotonic()
+        self.counts = {"ok": 0, "throttled": 0}
+        self.server = None
+
+    def admit(self):
+        """Returns 0 when the request is within the limit, else seconds until a slot frees."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.rpm), self._tokens + (now - self._updated) * self.rpm / 60)
+            self._updated = now
+            if self._tokens < 1:
+                self.counts["throttled"] += 1
+                return (1 - self._tokens) * 60 / self.rpm
+            self._tokens -= 1
+            self.counts["ok"] += 1
+            return 0
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                wait = fake.admit()
+                if wait:
+                    self._send(429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                               "code": "rate_limit_exceeded"}},
+                               {"retry-after": f"{wait:.2f}"})
+                    return
+                time.sleep(fake.latency)
+                prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+                content = "yes" if "Answer only 'yes' or 'no'" in prompt else "Here is some general guidance."
+                prompt_tokens = len(prompt) // 4
+                self._send(200, {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 8,
+                              "total_tokens": prompt_tokens + 8},
+                })
+
+        return Handler
+
+    def start(self, port=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        Thread(target=self.server.serve_forever, name="fake-groq", daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--rpm", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    url = FakeGroq(args.rpm, args.latency).start(args.port)
+    print(f"Fake Groq listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Deterministic local stand-ins for the external services the Python backend
+calls: ChatGroq, the HuggingFace embedder, the emotion model, the YouTube Data
+API, gTTS and S3. Each fake sleeps for a configurable latency so benchmarks
+exercise the real request path without network access or API keys.
+
+install() swaps them into model_registry / module globals; call it before the
+first request so the chains are built around the fakes.
+"""
+import sys
+import json
+import time
+import types
+import asyncio
+import hashlib
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_LATENCY = {
+    "llm": 0.15,          # Groq completion, large tier (70B)
+    "llm_small": 0.05,    # small tier (8B)
+    "llm_per_1k_chars": 0.02,
+    "embed": 0.01,        # XLM-R forward pass on CPU
+    "emotion": 0.02,      # DistilRoBERTa forward pass
+    "youtube": 0.05,      # one YouTube Data API call
+    "tts": 0.05,
+    "s3": 0.02,
+}
+
+CORPUS = [
+    "Depression is a common mental disorder characterised by persistent sadness and loss of interest.",
+    "Anxiety disorders involve excessive worry that is hard to control and interferes with daily life.",
+    "Regular sleep, physical activity and social contact support emotional well-being.",
+    "Grounding exercises such as 5-4-3-2-1 can help during a panic attack.",
+    "If you have thoughts of suicide, contact a crisis helpline or emergency services immediately.",
+    "Cognitive behavioural therapy helps people notice and change unhelpful thinking patterns.",
+    "Exam stress is common among students; breaking work into small steps can reduce it.",
+    "Mindfulness meditation trains attention and can lower stress and rumination.",
+]
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class FakeEmbeddings(Embeddings):
+    """Hash-seeded unit vectors: the same text always maps to the same vector."""
+
+    def __init__(self, dim=768, latency=DEFAULT_LATENCY["embed"]):
+        self.dim = dim
+        self.latency = latency
+
+    def _vector(self, text):
+        rng = np.random.default_rng(int.from_bytes(_digest(text)[:8], "little"))
+        v = rng.standard_normal(self.dim).astype("float32")
+        return (v / np.linalg.norm(v)).tolist()
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return self._vector(text)
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency * len(texts))
+        return [self._vector(t) for t in texts]
+
+
+class FakeChatModel:
+    """
+    Stands in for ChatGroq. Latency grows with prompt size like a real
+    completion; relevance prompts get "yes"/"no", everything else a canned answer.
+    """
+
+    def __init__(self, model_name="fake", latency=DEFAULT_LATENCY["llm"],
+                 per_1k_chars=DEFAULT_LATENCY["llm_per_1k_chars"]):
+        self.model_name = model_name
+        self.latency = latency
+        self.per_1k_chars = per_1k_chars
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, input, config=None, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        text = input.to_string() if hasattr(input, "to_string") else str(input)
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency + self.per_1k_chars * len(text) / 1000)
+        if "Answer only 'yes' or 'no'" in text:
+            return AIMessage(content="yes" if _digest(text)[0] % 4 else "no")
+        return AIMessage(content=f"[{self.model_name}] Here is some general guidance. "
+                                 f"Please reach out to a professional if this continues.")
+
+
+class FakeEmotionClassifier:
+    LABELS = ["sadness", "fear", "anger", "joy", "neutral", "disgust", "surprise"]
+
+    def __init__(self, latency=DEFAULT_LATENCY["emotion"]):
+        self.latency = latency
+
+    def __call__(self, text):
+        time.sleep(self.latency)
+        label = self.LABELS[_digest(text)[0] % len(self.LABELS)]
+        return [{"label": label, "score": 0.9}]
+
+
+def fake_video_item(video_id):
+    return {
+        "id": video_id,
+        "snippet": {
+            "title": f"Video {video_id}",
+            "channelTitle": "Wellbeing Channel",
+            "thumbnails": {"default": {"url": f"https://i.ytimg.com/vi/{video_id}/default.jpg"},
+                           "high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+        },
+        "contentDetails": {"duration": "PT4M13S"},
+        "statistics": {"viewCount": "1024"},
+    }
+
+
+def _search_ids(query, max_results):
+    seed = _digest(query).hex()
+    return [f"{seed[i:i + 11]}" for i in range(0, int(max_results) * 4, 4)]
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class FakeYouTubeClient:
+    """Mimics the googleapiclient resource used by fetch_youtube_videos."""
+
+    def __init__(self, latency=DEFAULT_LATENCY["youtube"]):
+        self.latency = latency
+
+    def search(self):
+        client = self
+
+        class Search:
+            def list(self, q, maxResults=5, **kwargs):
+                def run():
+                    time.sleep(client.latency)
+                    return {"items": [{"id": {"videoId": v}} for v in _search_ids(q, maxResults)]}
+                return _Request(run)
+        return Search()
+
+    def videos(self):
+        client = self
+
+        class Videos:
+            def list(self, id, **kwargs):
+                def run():
+                    time.sleep(client.latency)
+                    return {"items": [fake_video_item(v) for v in id.split(",")]}
+                return _Request(run)
+        return Videos()
+
+
+class FakeYouTubeServer:
+    """Local HTTP server for the search/videos endpoints used by youtube_async."""
+
+    def __init__(self, latency=DEFAULT_LATENCY["youtube"]):
+        self.latency = latency
+        self.port = None
+        self.calls = {"search": 0, "videos": 0}
+
+    def start(self):
+        from aiohttp import web
+
+        async def search(request):
+            self.calls["search"] += 1
+            await asyncio.sleep(self.latency)
+            ids = _search_ids(request.query["q"], request.query.get("maxResults", 5))
+            return web.json_response({"items": [{"id": {"videoId": v}} for v in ids]})
+
+        async def videos(request):
+            self.calls["videos"] += 1
+            await asyncio.sleep(self.latency)
+            return web.json_response({"items": [fake_video_item(v) for v in request.query["id"].split(",")]})
+
+        ready = threading.Event()
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            app = web.Application()
+            app.router.add_get("/search", search)
+            app.router.add_get("/videos", videos)
+            runner = web.AppRunner(app)
+            loop.run_until_complete(runner.setup())
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            loop.run_until_complete(site.start())
+            self.port = site._server.sockets[0].getsockname()[1]
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=serve, name="fake-youtube", daemon=True).start()
+        ready.wait()
+        return f"http://127.0.0.1:{self.port}"
+
+
+class FakeTTS:
+    latency = DEFAULT_LATENCY["tts"]
+
+    def __init__(self, text, **kwargs):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        time.sleep(self.latency)
+        # ~1 KB of "audio" per 100 characters, like a short mp3
+        fp.write(b"\xff\xfb" * (len(self.text) * 5))
+
+
+class FakeS3:
+    def __init__(self, latency=DEFAULT_LATENCY["s3"]):
+        self.latency = latency
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        time.sleep(self.latency)
+        self.objects[(Bucket, Key)] = len(Body)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+
+def build_fake_vectorstore(embeddings):
+    from langchain_community.vectorstores import FAISS
+    return FAISS.from_texts(CORPUS * 8, embeddings)
+
+
+def install(latency=None):
+    """Swaps every external dependency for its fake. Returns the fakes for inspection."""
+    latency = dict(DEFAULT_LATENCY, **(latency or {}))
+
+    import model_registry
+    import model_router
+    import chatbot_apis
+    import youtube_async
+
+    embeddings = FakeEmbeddings(latency=latency["embed"])
+    llm = FakeChatModel(model_router.LARGE_MODEL, latency["llm"], latency["llm_per_1k_chars"])
+    small_llm = FakeChatModel(model_router.SMALL_MODEL, latency["llm_small"], latency["llm_per_1k_chars"] / 3)
+    model_registry.override("embedder", embeddings)
+    model_registry.override("vectorstore", build_fake_vectorstore(embeddings))
+    model_registry.override(f"llm:{model_router.LARGE_MODEL}", llm)
+    model_registry.override(f"llm:{model_router.SMALL_MODEL}", small_llm)
+    model_registry.override("emotion_classifier", FakeEmotionClassifier(latency["emotion"]))
+    model_registry.override("youtube_client", FakeYouTubeClient(latency["youtube"]))
+
+    youtube = FakeYouTubeServer(latency["youtube"])
+    youtube_async.YOUTUBE_API_URL = youtube.start()
+
+    FakeTTS.latency = latency["tts"]
+    sys.modules["gtts"] = types.SimpleNamespace(gTTS=FakeTTS)
+    s3 = FakeS3(latency["s3"])
+    chatbot_apis.s3 = s3
+
+    return {"llm": llm, "small_llm": small_llm, "embeddings": embeddings, "youtube": youtube, "s3": s3}
+
+
+if __name__ == "__main__":
+    print(json.dumps(DEFAULT_LATENCY, indent=2))
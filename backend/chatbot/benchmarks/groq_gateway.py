@@ -0,0 +1,73 @@
+"""
+Drives a burst of chat completions against benchmarks.fake_groq, once with a
+bare ChatGroq client and once through llm_gateway, and reports how many calls
+succeeded, how many 429s reached the caller and the latency distribution.
+
+Run from backend/chatbot:
+    python -m benchmarks.groq_gateway [--requests 120] [--concurrency 16] [--provider-rpm 60]
+"""
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_groq import FakeGroq
+from benchmarks.stats import summarize_latencies
+
+
+def burst(invoke, requests, concurrency):
+    latencies, failures = [], {}
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            invoke(f"Question {i}: how can I sleep better before exams?")
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return None, type(e).__name__
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, error in pool.map(one, range(requests)):
+            if error:
+                failures[error] = failures.get(error, 0) + 1
+            else:
+                latencies.append(latency)
+    summary = summarize_latencies(latencies, time.perf_counter() - start, sum(failures.values()))
+    summary["failures"] = failures
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--provider-rpm", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--deadline", type=float, default=60)
+    args = parser.parse_args()
+
+    from langchain_groq import ChatGroq
+    from llm_gateway import GatewayLLM, LLMGateway
+
+    results = {}
+    for mode in ("bare", "gateway"):
+        # Fresh provider per mode so both start with an empty rate window
+        provider = FakeGroq(args.provider_rpm, args.latency)
+        base_url = provider.start()
+        llm = ChatGroq(model="fake", groq_api_key="fake", base_url=base_url, max_retries=0)
+        if mode == "gateway":
+            gateway = LLMGateway("fake", rpm=args.provider_rpm, tpm=10 ** 9,
+                                 max_concurrency=args.concurrency, deadline=args.deadline)
+            llm = GatewayLLM(llm, gateway)
+        results[mode] = burst(llm.invoke, args.requests, args.concurrency)
+        results[mode]["provider"] = dict(provider.counts)
+        if mode == "gateway":
+            results[mode]["gateway"] = gateway.stats()
+        provider.stop()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
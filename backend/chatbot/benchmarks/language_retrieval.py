@@ -0,0 +1,167 @@
+"""
+Search latency and context relevance per query language, global index vs.
+language-partitioned retrieval (chatbot_apis.retrieve_documents with
+LANG_ROUTING on and off).
+
+Run from backend/chatbot:
+    python -m benchmarks.language_retrieval --fake [--scale 200]
+    python -m benchmarks.language_retrieval [--queries queries.jsonl]
+
+--fake builds a synthetic en/hi/bn corpus with hash embeddings, so only the
+latency and language-purity numbers mean anything; the fallback count depends
+on real similarities and needs the real index. Without it the real
+vectorstore/db_faiss and its sub-indexes are used (build them first with
+chatbot_create_memory_for_llm.py). Query files are JSONL with {"query": ...}.
+
+Reported per language: p50/p95 search latency, the share of retrieved chunks
+in the query's language (purity), the mean best relevance score, how often
+the partition fell back to the global index, and the context characters per
+query that were in another language (prompt tokens spent on chunks the model
+cannot use well).
+"""
+import json
+import time
+import argparse
+
+from benchmarks.stats import summarize_latencies
+
+SAMPLE_QUERIES = [
+    "How can I manage exam stress?",
+    "What are the symptoms of depression?",
+    "I can't sleep at night, what should I do?",
+    "परीक्षा के तनाव को कैसे कम करें?",
+    "अवसाद के लक्षण क्या हैं?",
+    "मुझे रात को नींद नहीं आती, क्या करूँ?",
+    "পরীক্ষার চাপ কীভাবে কমাব?",
+    "বিষণ্ণতার লক্ষণগুলি কী কী?",
+    "রাতে ঘুম আসে না, কী করব?",
+]
+
+FAKE_CORPUS = {
+    "en": [
+        "Depression is a common mental disorder characterised by persistent sadness.",
+        "Anxiety disorders involve excessive worry that is hard to control.",
+        "Regular sleep and physical activity support emotional well-being.",
+        "Breaking exam preparation into small steps can reduce stress.",
+    ],
+    "hi": [
+        "अवसाद एक आम मानसिक विकार है जिसमें लगातार उदासी रहती है।",
+        "चिंता विकार में अत्यधिक चिंता होती है जिसे नियंत्रित करना कठिन है।",
+        "नियमित नींद और व्यायाम भावनात्मक स्वास्थ्य में मदद करते हैं।",
+        "परीक्षा की तैयारी को छोटे हिस्सों में बाँटने से तनाव कम होता है।",
+    ],
+    "bn": [
+        "বিষণ্ণতা একটি সাধারণ মানসিক ব্যাধি যাতে দীর্ঘস্থায়ী দুঃখ থাকে।",
+        "উদ্বেগজনিত ব্যাধিতে অতিরিক্ত দুশ্চিন্তা হয় যা নিয়ন্ত্রণ করা কঠিন।",
+        "নিয়মিত ঘুম ও ব্যায়াম মানসিক সুস্থতায় সাহায্য করে।",
+        "পরীক্ষার প্রস্তুতি ছোট ধাপে ভাগ করলে চাপ কমে।",
+    ],
+}
+
+
+def install_fake_indexes(scale):
+    """Global + per-language FAISS indexes over FAKE_CORPUS, registered like the real ones."""
+    import model_registry
+    from benchmarks import fakes
+    from langchain_community.vectorstores import FAISS
+    from language import detect_language
+
+    fakes.install()
+    embeddings = fakes.FakeEmbeddings(latency=0)
+    texts = [f"{text} ({i})" for lang, items in FAKE_CORPUS.items() for text in items for i in range(scale)]
+    metadatas = [{"lang": detect_language(t)} for t in texts]
+    vectors = embeddings.embed_documents(texts)
+
+    model_registry.override("vectorstore", FAISS.from_embeddings(list(zip(texts, vectors)), embeddings,
+                                                                 metadatas=metadatas))
+    partitions = {}
+    for lang in FAKE_CORPUS:
+        ids = [i for i, m in enumerate(metadatas) if m["lang"] == lang]
+        partitions[lang] = FAISS.from_embeddings(
+            [(texts[i], vectors[i]) for i in ids], embeddings, metadatas=[metadatas[i] for i in ids])
+    model_registry.override("vectorstore_languages", partitions)
+
+
+def fake_query_vector(query):
+    """Hash embeddings carry no meaning, so a fake query is placed near one chunk of its own language."""
+    import numpy as np
+    from benchmarks import fakes
+    from language import detect_language
+
+    embeddings = fakes.FakeEmbeddings(latency=0)
+    lang = detect_language(query)
+    items = FAKE_CORPUS.get(lang, FAKE_CORPUS["en"])
+    target = np.array(embeddings.embed_query(f"{items[len(query) % len(items)]} (0)"))
+    noise = np.array(embeddings.embed_query(query))
+    v = target + 0.5 * noise
+    return (v / np.linalg.norm(v)).tolist()
+
+
+def measure(queries, vectors, repeat):
+    import chatbot_apis
+    import metrics
+    from language import detect_language
+
+    per_lang = {}
+    for q in queries:
+        lang = detect_language(q)
+        row = per_lang.setdefault(lang, {"latencies": [], "purity": [], "best": [], "foreign_chars": 0, "queries": 0})
+        for _ in range(repeat):
+            start = time.perf_counter()
+            docs = chatbot_apis.retrieve_documents(q, vector=vectors[q])
+            row["latencies"].append(time.perf_counter() - start)
+        row["queries"] += 1
+        langs = [doc.metadata.get("lang") or detect_language(doc.page_content) for doc, _ in docs]
+        row["purity"].append(sum(1 for l in langs if l == lang) / len(langs) if langs else 0.0)
+        row["best"].append(max((score for _, score in docs if score is not None), default=0.0))
+        row["foreign_chars"] += sum(len(doc.page_content) for (doc, _), l in zip(docs, langs) if l != lang)
+
+    fallbacks = {}
+    for line in metrics.render_prometheus().splitlines():
+        if line.startswith("retrieval_partition_total{") and 'outcome="fallback"' in line:
+            lang = line.split('lang="')[1].split('"')[0]
+            fallbacks[lang] = float(line.rsplit(" ", 1)[1])
+
+    results = {}
+    for lang, row in per_lang.items():
+        summary = summarize_latencies(row["latencies"])
+        results[lang] = {
+            "queries": row["queries"],
+            "p50_ms": summary["p50_ms"],
+            "p95_ms": summary["p95_ms"],
+            "purity": round(sum(row["purity"]) / len(row["purity"]), 3),
+            "mean_best_relevance": round(sum(row["best"]) / len(row["best"]), 3),
+            "foreign_context_chars_per_query": round(row["foreign_chars"] / row["queries"], 1),
+            "fallbacks": fallbacks.get(lang, 0),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fake", action="store_true")
+    parser.add_argument("--scale", type=int, default=200, help="copies of each fake chunk")
+    parser.add_argument("--queries")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.fake:
+        install_fake_indexes(args.scale)
+    queries = SAMPLE_QUERIES
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [json.loads(line)["query"] for line in f if line.strip()]
+
+    import chatbot_apis
+
+    vector_for = fake_query_vector if args.fake else chatbot_apis.embed_query
+    vectors = {q: vector_for(q) for q in queries}
+    chatbot_apis.LANG_ROUTING = False
+    global_only = measure(queries, vectors, args.repeat)
+    chatbot_apis.LANG_ROUTING = True
+    partitioned = measure(queries, vectors, args.repeat)
+    print(json.dumps({"global": global_only, "partitioned": partitioned}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
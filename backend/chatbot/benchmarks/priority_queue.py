@@ -0,0 +1,85 @@
+"""
+Saturates one gateway with a mix of chat, relevance (background) and crisis
+calls against benchmarks.fake_groq, once with every call in the same class
+(FIFO-like) and once with their real priority classes, and reports latency
+and shed counts per class.
+
+Run from backend/chatbot:
+    python -m benchmarks.priority_queue [--requests 90] [--crisis-share 0.1] [--provider-rpm 60]
+    python -m benchmarks.priority_queue --gateway-rpm 60   # the gateway's RPM budget is the bottleneck
+"""
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_groq import FakeGroq
+from benchmarks.stats import summarize_latencies
+
+
+def make_workload(requests, crisis_share, background_share, seed=7):
+    rng = random.Random(seed)
+    classes = []
+    for _ in range(requests):
+        r = rng.random()
+        classes.append("crisis" if r < crisis_share else
+                       "background" if r < crisis_share + background_share else "chat")
+    return classes
+
+
+def run(classes, prioritized, args):
+    from langchain_groq import ChatGroq
+    from llm_gateway import LLMGateway, LLMUnavailable
+
+    provider = FakeGroq(args.provider_rpm, args.latency)
+    llm = ChatGroq(model="fake", groq_api_key="fake", base_url=provider.start(), max_retries=0)
+    gateway = LLMGateway("fake", rpm=args.gateway_rpm or args.provider_rpm, tpm=10 ** 9,
+                         max_concurrency=args.slots, deadline=args.deadline)
+
+    def one(cls):
+        start = time.perf_counter()
+        try:
+            gateway.call(lambda: llm.invoke(f"{cls} message"), 100,
+                         priority=cls if prioritized else "chat")
+            return cls, time.perf_counter() - start, None
+        except LLMUnavailable:
+            return cls, None, "unavailable"
+
+    results = {cls: {"latencies": [], "errors": 0} for cls in ("crisis", "chat", "background")}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for cls, latency, error in pool.map(one, classes):
+            if error:
+                results[cls]["errors"] += 1
+            else:
+                results[cls]["latencies"].append(latency)
+    elapsed = time.perf_counter() - start
+    provider.stop()
+    summary = {cls: summarize_latencies(r["latencies"], elapsed, r["errors"]) for cls, r in results.items()}
+    summary["scheduler"] = gateway.scheduler.stats()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=90)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--crisis-share", type=float, default=0.1)
+    parser.add_argument("--background-share", type=float, default=0.3)
+    parser.add_argument("--provider-rpm", type=int, default=600)
+    parser.add_argument("--gateway-rpm", type=int, help="gateway RPM budget (default: --provider-rpm)")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--deadline", type=float, default=60)
+    args = parser.parse_args()
+
+    classes = make_workload(args.requests, args.crisis_share, args.background_share)
+    print(json.dumps({
+        "fifo": run(classes, False, args),
+        "priority": run(classes, True, args),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
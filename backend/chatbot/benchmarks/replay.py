@@ -0,0 +1,223 @@
+"""
+Replays recorded conversations against the chat and recommendation APIs with
+the same call pattern the Node backend produces, and reports per-endpoint
+latency distributions, status codes and error rates.
+
+Run from backend/chatbot:
+    python -m benchmarks.replay conversation.json [more.jsonl ...] [--multiplier 20] [--time-scale 0.1]
+    python -m benchmarks.replay logs.jsonl --chat-url http://localhost:4001 --video-url http://localhost:4002
+
+Inputs: conversation.json (a role/content list), JSONL with one conversation
+per line (a list or {"messages": [...]}), or the conversation.jsonl log.
+Without --chat-url the unified server runs in-process on the stubbed
+upstreams from benchmarks.fakes.
+
+Per user turn (chatbotmessage.controller.createChatbotMessage):
+  POST /api/chat/message {message, history: last 10 turns}
+  then, for --audio-share of turns, POST /api/chat/message-audio {message: reply, messageId}
+Every --recommend-every turns and at the end of a conversation
+(user.controller.videoRecommendation, on the last 5 prompts):
+  POST /api/chat/pipeline {message, reply: false, scales: false, videos: true}
+  or, with --legacy-recommendations, check-relevance then /api/recommend-videos.
+
+Think time between turns comes from message "timestamp" fields when present,
+else --think seconds; both are multiplied by --time-scale (0 = no waiting).
+--multiplier replays every conversation that many times, --concurrency caps
+how many simulated users are active at once and --ramp spreads their starts.
+"""
+import json
+import time
+import random
+import argparse
+import urllib.request
+import urllib.error
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+
+from benchmarks.stats import summarize_latencies
+
+HISTORY_TURNS = 10
+RECOMMENDATION_PROMPTS = 5
+
+SAMPLE_CONVERSATIONS = [
+    [
+        {"role": "user", "content": "hi"},
+        {"role": "user", "content": "I have been stressed about my exams"},
+        {"role": "user", "content": "I can't sleep and I feel tired all day"},
+        {"role": "user", "content": "what can I do to relax before bed?"},
+    ],
+    [
+        {"role": "user", "content": "I feel lonely at college"},
+        {"role": "user", "content": "nobody talks to me and I feel down most days"},
+        {"role": "user", "content": "thanks, that helps"},
+    ],
+]
+
+
+def _parse_time(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _messages(obj):
+    if isinstance(obj, dict):
+        obj = obj.get("messages") or []
+    return [m for m in obj if isinstance(m, dict) and m.get("role")]
+
+
+def load_conversations(path):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            if data and isinstance(data[0], list) or data and isinstance(data[0], dict) and "messages" in data[0]:
+                return [_messages(c) for c in data]
+            return [_messages(data)]
+        lines = [json.loads(line) for line in f if line.strip()]
+    # The conversation log (conversation_store) is one chat: a header, then a message per line
+    if lines and isinstance(lines[0], dict) and lines[0].get("format") == "welli-conversation":
+        return [_messages(lines[1:])]
+    return [_messages(c) for c in lines]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            self.statuses[endpoint][status] += 1
+            if status == 200:
+                self.latencies[endpoint].append(seconds)
+
+    def report(self, elapsed):
+        report = {}
+        for endpoint, statuses in self.statuses.items():
+            total = sum(statuses.values())
+            errors = total - statuses.get(200, 0)
+            summary = summarize_latencies(self.latencies[endpoint], elapsed, errors)
+            summary["error_rate"] = round(errors / total, 4) if total else 0.0
+            summary["statuses"] = {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))}
+            report[endpoint] = summary
+        return report
+
+
+def call(recorder, base_url, endpoint, body, timeout=120):
+    req = urllib.request.Request(base_url + endpoint, data=json.dumps(body).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            data = json.loads(resp.read() or b"{}")
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        data, status = None, e.code
+    except Exception as e:
+        data, status = None, type(e).__name__
+    recorder.record(endpoint, status, time.perf_counter() - start)
+    return data
+
+
+def replay_user(conversation, user_id, args, recorder):
+    rng = random.Random(f"{args.seed}-{user_id}")
+    time.sleep(rng.uniform(0, args.ramp))
+    turns = [m for m in conversation if m["role"] == "user"]
+    history, prompts, previous_ts = [], [], None
+
+    for i, turn in enumerate(turns):
+        ts = _parse_time(turn.get("timestamp"))
+        think = (ts - previous_ts) if ts is not None and previous_ts is not None else (args.think if i else 0)
+        previous_ts = ts
+        if think > 0 and args.time_scale > 0:
+            time.sleep(min(think * args.time_scale, args.max_think))
+
+        message = turn["content"]
+        data = call(recorder, args.chat_url, "/api/chat/message",
+                    {"message": message, "history": history[-2 * HISTORY_TURNS:]})
+        reply = (data or {}).get("reply") or ""
+        history += [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+        prompts.append(message)
+
+        if reply and rng.random() < args.audio_share:
+            call(recorder, args.chat_url, "/api/chat/message-audio",
+                 {"message": reply, "messageId": f"replay-{user_id}-{i}"})
+
+        last = i == len(turns) - 1
+        if last or (args.recommend_every and (i + 1) % args.recommend_every == 0):
+            # Node joins the newest prompts first
+            query = " ".join(reversed(prompts[-RECOMMENDATION_PROMPTS:])) + " "
+            if args.legacy_recommendations:
+                data = call(recorder, args.chat_url, "/api/chat/check-relevance", {"message": query})
+                if data and "yes" in (data.get("reply") or ""):
+                    call(recorder, args.video_url, "/api/recommend-videos", {"userQuery": query})
+            else:
+                call(recorder, args.chat_url, "/api/chat/pipeline",
+                     {"message": query, "reply": False, "scales": False, "videos": True})
+    return len(turns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--chat-url")
+    parser.add_argument("--video-url", help="defaults to --chat-url (the unified server)")
+    parser.add_argument("--multiplier", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--time-scale", type=float, default=0.0)
+    parser.add_argument("--think", type=float, default=5.0)
+    parser.add_argument("--max-think", type=float, default=30.0)
+    parser.add_argument("--ramp", type=float, default=0.0)
+    parser.add_argument("--audio-share", type=float, default=0.3)
+    parser.add_argument("--recommend-every", type=int, default=0)
+    parser.add_argument("--legacy-recommendations", action="store_true")
+    parser.add_argument("--latency", default="{}", help='JSON overrides for fake latencies, e.g. {"llm": 0.3}')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    conversations = [c for path in args.paths for c in load_conversations(path)] or SAMPLE_CONVERSATIONS
+    conversations = [c for c in conversations if any(m["role"] == "user" for m in c)]
+
+    server = None
+    if not args.chat_url:
+        from benchmarks import fakes
+        from benchmarks.run import start_server
+
+        fakes.install(json.loads(args.latency))
+        server, args.chat_url = start_server()
+    args.video_url = args.video_url or args.chat_url
+
+    users = [c for c in conversations for _ in range(args.multiplier)]
+    recorder = Recorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        turns = sum(pool.map(lambda iu: replay_user(iu[1], iu[0], args, recorder), enumerate(users)))
+    elapsed = time.perf_counter() - start
+    if server:
+        server.shutdown()
+
+    report = {
+        "conversations": len(conversations),
+        "users": len(users),
+        "turns": turns,
+        "elapsed_s": round(elapsed, 2),
+        "turns_per_s": round(turns / elapsed, 2),
+        "endpoints": recorder.report(elapsed),
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Payload size and serialization cost of the JSON responses, before and after
+server_common.add_response_layer: Flask's default encoder vs. orjson, and
+identity vs. gzip vs. brotli (when installed) on the wire.
+
+Run from backend/chatbot:
+    python -m benchmarks.response_size [--repeat 2000]
+
+Payloads are real responses from the stubbed server (benchmarks.fakes):
+recommend-videos, a long chat reply in English and Hindi, the pipeline and a
+full scale breakdown of conversation.json. The long replies are written out
+sentence by sentence: repeated text compresses far better than real replies
+do. Also checks that a repeated GET of /api/emotion-stats with If-None-Match
+comes back as an empty 304.
+"""
+import time
+import json
+import gzip
+import argparse
+
+from benchmarks.stats import summarize_latencies
+
+LONG_REPLY = (
+    "It sounds like the last few weeks have been really heavy, and it makes sense that you feel worn out. "
+    "Exams put pressure on sleep, appetite and mood all at once, so none of this means you are failing. "
+    "Try going to bed and waking up at the same time each day, even on weekends, and keep screens out of "
+    "the last half hour before sleep. If your mind races at night, write tomorrow's tasks on paper so they "
+    "feel parked somewhere. During the day, study in blocks of about forty minutes with a short walk or a "
+    "glass of water in between. Eating regular meals helps more than it seems; skipping breakfast often "
+    "shows up as afternoon anxiety. Slow breathing, four seconds in and six out for a couple of minutes, "
+    "can take the edge off before a test. Talking to a friend, a family member or a college counsellor is "
+    "not a burden on them, and saying the worry out loud often shrinks it. If you notice that you feel "
+    "hopeless most days, or have thoughts of hurting yourself, please reach out to a helpline or a doctor "
+    "today. Would you like a simple plan for the next week that fits around your exam timetable?"
+)
+LONG_REPLY_HI = (
+    "ऐसा लगता है कि पिछले कुछ हफ्ते आपके लिए बहुत भारी रहे हैं, और थकान महसूस होना स्वाभाविक है। "
+    "परीक्षा का दबाव नींद, भूख और मन तीनों पर एक साथ असर डालता है, इसका मतलब यह नहीं कि आप असफल हो रहे हैं। "
+    "हर दिन एक ही समय पर सोने और उठने की कोशिश करें, और सोने से आधा घंटा पहले फ़ोन दूर रख दें। "
+    "अगर रात में विचार रुकते नहीं, तो कल के काम कागज़ पर लिख लें ताकि दिमाग़ को आराम मिले। "
+    "दिन में लगभग चालीस मिनट पढ़ें, फिर थोड़ी देर टहलें या पानी पिएँ। "
+    "समय पर खाना खाना भी मदद करता है; नाश्ता छोड़ने से दोपहर में बेचैनी बढ़ सकती है। "
+    "परीक्षा से पहले धीमी साँस लें, चार गिनती तक अंदर और छह तक बाहर, दो-तीन मिनट के लिए। "
+    "किसी दोस्त, परिवार के सदस्य या कॉलेज के काउंसलर से बात करना उन पर बोझ नहीं है। "
+    "अगर ज़्यादातर दिन निराशा लगती है या ख़ुद को नुकसान पहुँचाने के विचार आते हैं, तो आज ही किसी हेल्पलाइन या डॉक्टर से संपर्क करें। "
+    "क्या आप अपनी परीक्षा की समय-सारणी के हिसाब से अगले हफ्ते की एक आसान योजना बनाना चाहेंगे?"
+)
+
+
+def collect_payloads(client):
+    import conversation_store
+
+    conversation = [m["content"] for m in conversation_store.load_messages() if m.get("role") == "user"]
+    if not conversation:
+        conversation = ["I feel low and tired", "I can't sleep and I worry about exams every day"]
+    payloads = {
+        "recommend-videos": client.post("/api/recommend-videos",
+                                        json={"userQuery": "I feel sad and lonely"}).get_json(),
+        "pipeline": client.post("/api/chat/pipeline",
+                                json={"message": "I can't sleep and I worry about exams", "videos": True}).get_json(),
+        "scales": client.post("/api/scales/estimate", json={"messages": conversation * 4}).get_json(),
+        "chat-reply-en": {"reply": LONG_REPLY},
+        "chat-reply-hi": {"reply": LONG_REPLY_HI},
+    }
+    return payloads
+
+
+def time_call(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return summarize_latencies(latencies)["p50_ms"]
+
+
+def measure(app, payloads, repeat):
+    from flask.json.provider import DefaultJSONProvider
+    from server_common import OrjsonProvider, orjson, brotli, GZIP_LEVEL, BROTLI_QUALITY
+
+    default = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app) if orjson is not None else None
+    results = {}
+    for name, obj in payloads.items():
+        before = default.dumps(obj).encode("utf-8")
+        row = {"default_bytes": len(before), "default_dumps_ms": time_call(lambda: default.dumps(obj), repeat)}
+        body = before
+        if fast is not None:
+            body = fast.dumps(obj).encode("utf-8")
+            row.update({"orjson_bytes": len(body), "orjson_dumps_ms": time_call(lambda: fast.dumps(obj), repeat)})
+        row["gzip_bytes"] = len(gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0))
+        row["gzip_ms"] = time_call(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), repeat // 10 or 1)
+        if brotli is not None:
+            row["br_bytes"] = len(brotli.compress(body, quality=BROTLI_QUALITY))
+            row["br_ms"] = time_call(lambda: brotli.compress(body, quality=BROTLI_QUALITY), repeat // 10 or 1)
+        row["wire_reduction"] = round(1 - min(row.get("br_bytes", row["gzip_bytes"]), len(body)) / len(before), 3)
+        results[name] = row
+    return results
+
+
+def check_revalidation(client):
+    url = "/api/emotion-stats"
+    first = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    again = client.get(url, headers={"Accept-Encoding": "gzip, br", "If-None-Match": first.headers.get("ETag", "")})
+    return {"first_status": first.status_code, "first_bytes": len(first.data),
+            "content_encoding": first.headers.get("Content-Encoding"),
+            "revalidate_status": again.status_code, "revalidate_bytes": len(again.data)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    from benchmarks import fakes
+
+    fakes.install()
+    from inference_server import app
+
+    client = app.test_client()
+    payloads = collect_payloads(client)
+    report = {"payloads": measure(app, payloads, args.repeat), "etag": check_revalidation(client)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
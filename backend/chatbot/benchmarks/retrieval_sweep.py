@@ -0,0 +1,253 @@
+"""
+Sweeps chunking and retrieval parameters and reports, per configuration,
+chunk count, index size, build time, search latency and hit@k on a labeled
+query set.
+
+Run from backend/chatbot:
+    python -m benchmarks.retrieval_sweep --queries labeled.jsonl [--data data/]
+    python -m benchmarks.retrieval_sweep --fake
+
+Query files are JSONL: {"query": "...", "expected": ["phrase", ...]}; a hit is
+a retrieved chunk containing any expected phrase (case-insensitive).
+
+Grid (comma-separated): --chunk-sizes 300,500,800 --overlaps 0,50,100
+--k 1,3,5 --index-types flat,hnsw,ivf. Embeddings are cached by text in
+--embedding-cache, so chunks that come out identical across sizes/overlaps
+(and reruns) are embedded once. --fake swaps the PDFs and the sentence
+transformer for a synthetic corpus and a hashed bag-of-words embedder, which
+is enough to see the chunk-size/recall trade-off offline.
+"""
+import os
+import json
+import time
+import pickle
+import random
+import hashlib
+import argparse
+
+import numpy as np
+
+from benchmarks.stats import summarize_latencies
+
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-xlm-r-multilingual-v1"
+
+FAKE_TOPICS = [
+    ("exam stress", "Breaking exam preparation into small steps and taking short breaks reduces exam stress."),
+    ("panic attack", "During a panic attack, slow breathing and the 5-4-3-2-1 grounding exercise help."),
+    ("insomnia", "A fixed wake-up time and no screens before bed are the first steps against insomnia."),
+    ("depression symptoms", "Persistent sadness, loss of interest and fatigue for two weeks are symptoms of depression."),
+    ("suicidal thoughts", "Anyone having suicidal thoughts should contact a crisis helpline or emergency services."),
+    ("social anxiety", "Gradual exposure to feared social situations is effective for social anxiety."),
+    ("burnout", "Burnout shows as exhaustion, cynicism and reduced performance after long-term stress."),
+    ("mindfulness", "Mindfulness practice means paying attention to the present moment without judgement."),
+]
+FILLER_WORDS = ("health wellbeing people support daily routine often many students feel time family "
+                "help care mind body life work change small steps sometimes important common").split()
+
+
+class HashedBagOfWords:
+    """Deterministic stand-in embedder: hashed token counts, L2-normalised."""
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def _vector(self, text):
+        v = np.zeros(self.dim, dtype="float32")
+        for token in text.lower().split():
+            token = token.strip(".,;:!?()\"'")
+            if token:
+                v[int(hashlib.md5(token.encode("utf-8")).hexdigest()[:8], 16) % self.dim] += 1
+        return v / (np.linalg.norm(v) + 1e-12)
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def fake_corpus(pages=40, seed=3):
+    """Pages of filler with each topic's key sentence placed at random positions."""
+    from langchain_core.documents import Document
+
+    rng = random.Random(seed)
+    docs = []
+    for page in range(pages):
+        sentences = [" ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+                     for _ in range(30)]
+        topic, key = FAKE_TOPICS[page % len(FAKE_TOPICS)]
+        sentences.insert(rng.randint(0, len(sentences)), key)
+        docs.append(Document(page_content=" ".join(sentences), metadata={"page": page, "topic": topic}))
+    return docs
+
+
+FAKE_QUERIES = [
+    {"query": "how do I handle exam stress", "expected": ["exam stress"]},
+    {"query": "what helps during a panic attack", "expected": ["panic attack"]},
+    {"query": "I can't sleep, insomnia tips", "expected": ["insomnia"]},
+    {"query": "what are the symptoms of depression", "expected": ["symptoms of depression"]},
+    {"query": "I have suicidal thoughts, who do I contact", "expected": ["crisis helpline"]},
+    {"query": "treatment for social anxiety", "expected": ["social anxiety"]},
+    {"query": "signs of burnout", "expected": ["burnout"]},
+    {"query": "what is mindfulness", "expected": ["mindfulness practice"]},
+]
+
+
+class EmbeddingCache:
+    def __init__(self, embedder, model_name, path=None):
+        self.embedder = embedder
+        self.model_name = model_name
+        self.path = path
+        self.vectors = {}
+        self.hits = self.misses = 0
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                self.vectors = pickle.load(f)
+
+    def _key(self, text):
+        return hashlib.sha1(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts):
+        keys = [self._key(t) for t in texts]
+        missing = [(k, t) for k, t in zip(keys, texts) if k not in self.vectors]
+        # Texts repeated within one call are embedded once
+        missing = list(dict(missing).items())
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            for (k, _), v in zip(missing, self.embedder.embed_documents([t for _, t in missing])):
+                self.vectors[k] = np.asarray(v, dtype="float32")
+        return np.vstack([self.vectors[k] for k in keys])
+
+    def save(self):
+        if self.path:
+            with open(self.path, "wb") as f:
+                pickle.dump(self.vectors, f)
+
+
+def build_index(index_type, vectors):
+    import faiss
+
+    dim = vectors.shape[1]
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, 32)
+    elif index_type == "ivf":
+        nlist = max(1, int(np.sqrt(len(vectors))))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist)
+        index.train(vectors)
+        index.nprobe = max(1, nlist // 8)
+    else:
+        raise ValueError(f"unknown index type {index_type}")
+    index.add(vectors)
+    return index
+
+
+def is_hit(text, expected):
+    text = text.lower()
+    return any(phrase.lower() in text for phrase in expected)
+
+
+def run_config(documents, cache, queries, query_vectors, chunk_size, overlap, ks, index_type):
+    import faiss
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    # Same splitter as chatbot_create_memory_for_llm.create_chunks
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=overlap)
+    chunks = [c.page_content for c in splitter.split_documents(documents)]
+
+    misses_before = cache.misses
+    start = time.perf_counter()
+    vectors = cache.embed(chunks)
+    embed_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index = build_index(index_type, vectors)
+    build_seconds = time.perf_counter() - start
+
+    max_k = max(ks)
+    latencies, hits = [], {k: 0 for k in ks}
+    for q, qv in zip(queries, query_vectors):
+        start = time.perf_counter()
+        _, ids = index.search(qv.reshape(1, -1), max_k)
+        latencies.append(time.perf_counter() - start)
+        found = [is_hit(chunks[i], q["expected"]) for i in ids[0] if i >= 0]
+        for k in ks:
+            hits[k] += any(found[:k])
+
+    summary = summarize_latencies(latencies)
+    return {
+        "chunk_size": chunk_size,
+        "overlap": overlap,
+        "index_type": index_type,
+        "chunks": len(chunks),
+        "index_bytes": int(faiss.serialize_index(index).size),
+        "embedded_chunks": cache.misses - misses_before,
+        "embed_seconds": round(embed_seconds, 3),
+        "build_seconds": round(build_seconds, 4),
+        "search_p50_ms": summary["p50_ms"],
+        "search_p95_ms": summary["p95_ms"],
+        **{f"hit@{k}": round(hits[k] / len(queries), 3) for k in ks},
+    }
+
+
+def parse_list(value, cast=int):
+    return [cast(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fake", action="store_true")
+    parser.add_argument("--data", default="data/")
+    parser.add_argument("--queries")
+    parser.add_argument("--chunk-sizes", default="300,500,800")
+    parser.add_argument("--overlaps", default="0,50,100")
+    parser.add_argument("--k", default="1,3,5")
+    parser.add_argument("--index-types", default="flat,hnsw,ivf")
+    parser.add_argument("--embedding-cache", help="pickle file reused across runs")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    if args.fake:
+        documents, embedder, model_name = fake_corpus(), HashedBagOfWords(), "hashed-bow"
+        queries = FAKE_QUERIES
+    else:
+        from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        documents = DirectoryLoader(args.data, glob="*.pdf", loader_cls=PyPDFLoader).load()
+        # Same unit-length embeddings as chatbot_create_memory_for_llm
+        embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, encode_kwargs={"normalize_embeddings": True})
+        model_name = EMBEDDING_MODEL
+        queries = []
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [json.loads(line) for line in f if line.strip()]
+    if not queries:
+        parser.error("a labeled query set is required (--queries), except with --fake")
+
+    cache = EmbeddingCache(embedder, model_name, args.embedding_cache)
+    query_vectors = np.asarray(embedder.embed_documents([q["query"] for q in queries]), dtype="float32")
+    ks = parse_list(args.k)
+
+    results = []
+    for chunk_size in parse_list(args.chunk_sizes):
+        for overlap in parse_list(args.overlaps):
+            if overlap >= chunk_size:
+                continue
+            for index_type in parse_list(args.index_types, str):
+                row = run_config(documents, cache, queries, query_vectors, chunk_size, overlap, ks, index_type)
+                results.append(row)
+                print(json.dumps(row))
+    cache.save()
+
+    print(f"\nEmbedding cache: {cache.hits} reused, {cache.misses} embedded")
+    best = max(results, key=lambda r: (r[f"hit@{ks[-1]}"], -r["search_p50_ms"]))
+    print(f"Best hit@{ks[-1]}: {json.dumps(best)}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
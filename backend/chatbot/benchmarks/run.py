@@ -0,0 +1,197 @@
+"""
+Offline benchmark suite for the Python backend.
+
+Run from backend/chatbot:
+    python -m benchmarks.run [--concurrency 1,8,32] [--requests 200] [--out bench.json]
+    python -m benchmarks.run --compare old.json new.json
+
+Boots the unified inference server in-process on a real HTTP socket with every
+external dependency replaced by the fakes in benchmarks.fakes, then drives each
+endpoint at each concurrency level and records throughput and p50/p95/p99
+latency. scale_detection.estimate_scores is measured as a plain function.
+Results are written as JSON so runs from two commits can be compared.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+from benchmarks import fakes
+from benchmarks.stats import summarize_latencies
+
+MESSAGES = [
+    "I feel anxious before every exam and can't sleep",
+    "How do I deal with feeling lonely at college?",
+    "What are grounding exercises for panic attacks?",
+    "I have been feeling down and tired for weeks",
+    "Is it normal to feel overwhelmed all the time?",
+    "hello",
+    "My friend seems depressed, how can I help?",
+    "I get angry very quickly these days",
+]
+
+HISTORY = [
+    {"role": "user", "content": "I have been stressed about my studies"},
+    {"role": "assistant", "content": "That sounds hard. What part of your studies worries you most?"},
+    {"role": "user", "content": "Mostly the exams next month"},
+    {"role": "assistant", "content": "Planning small daily study blocks can make exams feel more manageable."},
+]
+
+
+def payload_for(endpoint, rng):
+    message = rng.choice(MESSAGES)
+    if endpoint == "/api/chat/message":
+        return {"message": message, "history": HISTORY}
+    if endpoint == "/api/chat/message-audio":
+        return {"message": message * 3, "messageId": f"bench-{rng.randrange(10 ** 9)}"}
+    if endpoint == "/api/recommend-videos":
+        return {"userQuery": message}
+    return {"message": message}
+
+
+ENDPOINTS = ["/api/chat/message", "/api/chat/check-relevance", "/api/chat/message-audio", "/api/recommend-videos"]
+
+
+def start_server():
+    import logging
+    from werkzeug.serving import make_server
+    from inference_server import app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def post(url, body):
+    req = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        resp.read()
+        return resp.status
+
+
+def run_load(fn, requests, concurrency):
+    latencies, errors = [], 0
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            fn(i)
+            return time.perf_counter() - start
+        except Exception:
+            return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for result in pool.map(one, range(requests)):
+            if result is None:
+                errors += 1
+            else:
+                latencies.append(result)
+    return summarize_latencies(latencies, time.perf_counter() - start, errors)
+
+
+def bench_endpoint(base_url, endpoint, requests, concurrency, seed):
+    rng = random.Random(seed)
+    bodies = [payload_for(endpoint, rng) for _ in range(requests)]
+    return run_load(lambda i: post(base_url + endpoint, bodies[i]), requests, concurrency)
+
+
+def bench_scales(requests, concurrency, seed):
+    from scale_detection import estimate_scores
+
+    rng = random.Random(seed)
+    convos = [[rng.choice(MESSAGES) for _ in range(10)] for _ in range(requests)]
+    return run_load(lambda i: estimate_scores(convos[i]), requests, concurrency)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'benchmark':48} {'metric':15} {'old':>10} {'new':>10} {'change':>8}")
+    for name, levels in new["results"].items():
+        for level, summary in levels.items():
+            before = old["results"].get(name, {}).get(level)
+            if not before:
+                continue
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+                a, b = before.get(metric), summary.get(metric)
+                if a is None or b is None:
+                    continue
+                change = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+                print(f"{name + ' @' + level:48} {metric:15} {a:>10} {b:>10} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and level")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS + ["estimate_scores"]))
+    parser.add_argument("--latency", default="{}", help='JSON overrides for fake latencies, e.g. {"llm": 0.3}')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Route limits and the Groq rate budget would turn the benchmark into a
+    # 503 count; measure raw capacity unless the caller sets them explicitly
+    os.environ.setdefault("ROUTE_QUEUE_TIMEOUT", "600")
+    os.environ.setdefault("GROQ_RPM", "1000000")
+    os.environ.setdefault("GROQ_TPM", "1000000000")
+    os.environ.setdefault("GROQ_MAX_CONCURRENCY", "256")
+    latency = json.loads(args.latency)
+    fakes.install(latency)
+    server, base_url = start_server()
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = {}
+    for name in args.endpoints.split(","):
+        results[name] = {}
+        for level in levels:
+            if name == "estimate_scores":
+                summary = bench_scales(args.requests, level, args.seed)
+            else:
+                summary = bench_endpoint(base_url, name, args.requests, level, args.seed)
+            results[name][str(level)] = summary
+            print(f"{name:32} c={level:<4} {summary}", file=sys.stderr)
+    server.shutdown()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "requests": args.requests,
+        "latency": dict(fakes.DEFAULT_LATENCY, **latency),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares resident memory of the two-process deployment (chatbot_apis +
+video_recommender_api) with the unified inference_server.
+
+Run from backend/chatbot (Linux, needs the real models available):
+    python -m benchmarks.server_memory
+
+Every server is booted with its preload flag so all models are in memory,
+then VmRSS is read from /proc once /api/ready answers 200.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from benchmarks.startup import CHATBOT_DIR, free_port, wait_ready
+
+SPLIT = [
+    ("chatbot_apis.py", "PORT", "CHATBOT_PRELOAD"),
+    ("video_recommender_api.py", "RECOMMENDER_PORT", "RECOMMENDER_PRELOAD"),
+]
+UNIFIED = [("inference_server.py", "INFERENCE_PORT", "INFERENCE_PRELOAD")]
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def boot(servers, timeout):
+    procs, usage = [], {}
+    try:
+        for script, port_env, preload_env in servers:
+            port = free_port()
+            env = dict(os.environ, **{port_env: str(port), preload_env: "1"})
+            proc = subprocess.Popen([sys.executable, script], cwd=CHATBOT_DIR, env=env,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            procs.append(proc)
+            if not wait_ready(port, timeout):
+                raise RuntimeError(f"{script} did not become ready within {timeout}s")
+            usage[script] = round(rss_mb(proc.pid), 1)
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+    return usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timeout", type=int, default=600)
+    args = parser.parse_args()
+
+    split = boot(SPLIT, args.timeout)
+    unified = boot(UNIFIED, args.timeout)
+    split_total = round(sum(split.values()), 1)
+    unified_total = round(sum(unified.values()), 1)
+    print(json.dumps({
+        "split_mb": split,
+        "split_total_mb": split_total,
+        "unified_mb": unified_total,
+        "saved_mb": round(split_total - unified_total, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures how long the recommender process takes to come up.
+
+Run from backend/chatbot:
+    python -m benchmarks.startup [--runs 5] [--serve] [--preload]
+
+Reports the time to import the API module in a fresh interpreter and, with
+--serve, the time until a spawned server answers /api/ready.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+CHATBOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module, runs):
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - t)"
+    )
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=CHATBOT_DIR,
+                             capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=300, proc=None):
+    """Polls /api/ready until it answers 200; returns False on timeout or if proc exits."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc is not None and proc.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ready", timeout=1) as resp:
+                if resp.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.02)
+    return False
+
+
+def measure_serve(script, port_env, runs, preload, timeout=300):
+    """Seconds to ready for each run that got there, and how many runs didn't."""
+    samples, failed = [], 0
+    for _ in range(runs):
+        port = free_port()
+        env = dict(os.environ, **{port_env: str(port)})
+        if preload:
+            env["RECOMMENDER_PRELOAD"] = "1"
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, script], cwd=CHATBOT_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if wait_ready(port, timeout, proc):
+                samples.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        finally:
+            proc.terminate()
+            proc.wait()
+    return samples, failed
+
+
+def summarize(samples, failed=0):
+    if not samples:
+        return {"runs": 0, "failed": failed}
+    return {
+        "runs": len(samples),
+        "failed": failed,
+        "min_s": round(min(samples), 4),
+        "median_s": round(statistics.median(samples), 4),
+        "max_s": round(max(samples), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--module", default="video_recommender_api")
+    parser.add_argument("--serve", action="store_true", help="also time until /api/ready answers 200")
+    parser.add_argument("--preload", action="store_true", help="with --serve, boot with RECOMMENDER_PRELOAD=1")
+    args = parser.parse_args()
+
+    results = {"import": summarize(measure_import(args.module, args.runs))}
+    if args.serve:
+        results["ready"] = summarize(*measure_serve("video_recommender_api.py", "RECOMMENDER_PORT",
+                                                    args.runs, args.preload))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import statistics
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(q / 100 * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def summarize_latencies(latencies, elapsed=None, errors=0):
+    """Latency summary in milliseconds; throughput when the wall-clock `elapsed` is given."""
+    values = sorted(latencies)
+    ms = lambda v: None if v is None else round(v * 1000, 3)
+    summary = {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "mean_ms": ms(statistics.mean(values)) if values else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else None,
+    }
+    if elapsed:
+        summary["throughput_rps"] = round(len(values) / elapsed, 2)
+    return summary
@@ -1,23 +1,50 @@
 import boto3
 import os
+import numpy as np
+import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from dotenv import load_dotenv
-from threading import Lock
-from flask import Flask, request, jsonify, Response
+from flask import Flask, Blueprint, request, jsonify, Response
 from flask_cors import CORS
 
 from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
 from langchain.chains import RetrievalQA
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
+import faq_cache
+import metrics
+import model_registry
+import model_router
+import scale_detection
+import session_store
+from coalesce import SingleFlight, request_key
+from llm_gateway import GatewayLLM, LLMUnavailable, gateway_stats, get_gateway, priority_scope, should_shed
+from language import detect_language
+from metrics import stage_timer, timed
+from server_common import add_health_routes, add_memory_routes, add_metrics_routes, add_response_layer, limit_concurrency
+
 load_dotenv()
 
 # Configuration
 DB_FAISS_PATH = "vectorstore/db_faiss"
+# Per-language sub-indexes built by chatbot_create_memory_for_llm.py
+LANG_INDEX_DIR = "vectorstore/db_faiss_lang"
+LANG_ROUTING = os.getenv("LANG_ROUTING", "1") == "1"
+# Chunks passed to the prompt (tune with benchmarks/retrieval_sweep.py)
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", 3))
+# Threads for the pipeline's leaf tasks (relevance, emotion, retrieval, scales,
+# videos: up to 5 per request). Kept apart from the shared model_registry pool so
+# pipeline requests queue behind each other here rather than behind preloads
+# and other services' work.
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", 32))
+# Below this best cosine similarity (or with fewer than k hits) the partition
+# result is dropped and the global index is searched instead. Indexes without
+# unit vectors have no similarity (see search_store) and never fall back.
+LANG_FALLBACK_RELEVANCE = float(os.getenv("LANG_FALLBACK_RELEVANCE", 0.3))
 
 CUSTOM_PROMPT_TEMPLATE = """
 You are a helpful medical assistant. First detect the user's language and answer in the same language. Don't need to mention the language you are using.
@@ -41,50 +68,316 @@ def set_custom_prompt(template: str):
     return PromptTemplate(template=template, input_variables=["context", "question", "history"])
 
 
-def load_llm(model_name="llama-3.3-70b-versatile"):
-    return ChatGroq(model=model_name, temperature=0.2, groq_api_key=os.environ.get("GROQ_API_KEY", ""))
+# The model used when no routing applies; model_router picks per request
+DEFAULT_MODEL = model_router.LARGE_MODEL
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-xlm-r-multilingual-v1"
+
+
+def load_llm(model_name=DEFAULT_MODEL):
+    # Retries are owned by llm_gateway, which paces them against the rate budget
+    return ChatGroq(model=model_name, temperature=0.2, groq_api_key=os.environ.get("GROQ_API_KEY", ""),
+                    max_retries=0)
+
+
+def get_llm(model_name=DEFAULT_MODEL):
+    """Shared client per model; ChatGroq is thread-safe, so every route reuses one."""
+    return model_registry.register(f"llm:{model_name}", lambda: load_llm(model_name)).get()
+
+
+def get_gated_llm(model_name=DEFAULT_MODEL):
+    """The shared client behind the model's rate-limit gateway; chains call this one."""
+    return GatewayLLM(get_llm(model_name), get_gateway(model_name))
 
 
 def load_vectorstore(db_path=DB_FAISS_PATH):
-    embed = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/paraphrase-xlm-r-multilingual-v1")
+    embed = model_registry.get("embedder")
     return FAISS.load_local(db_path, embed, allow_dangerous_deserialization=True)
 
 
-# Lazy initialization for QA chain (thread-safe)
-_init_lock = Lock()
-_qa_chain = None
+class RoutedChain:
+    """
+    prompt -> LLM tier picked per request by model_router -> string, as plain
+    calls. Every LCEL step would add a Runnable layer (and its per-call
+    bookkeeping) to each invoke; here each step is timed inside the call into
+    rag_stage_seconds{pipeline, stage}, which costs a flag check when metrics
+    are off. `config` is passed to the prompt, model and parser, so callbacks
+    and tracing still see every step.
+    """
+
+    def __init__(self, pipeline, prompt, choose_route, prepare=None):
+        self.pipeline = pipeline
+        self.prompt = prompt
+        self.choose_route = choose_route
+        self.prepare = prepare
+        self.parser = StrOutputParser()
+
+    def invoke(self, inputs, config=None):
+        x = self.prepare(inputs) if self.prepare else inputs
+        with stage_timer(self.pipeline, "prompt_format"):
+            prompt_value = self.prompt.invoke({k: x[k] for k in self.prompt.input_variables}, config)
+        route = self.choose_route(x)
+        start = time.perf_counter()
+        with stage_timer(self.pipeline, "llm"):
+            message = get_gated_llm(route.model).invoke(prompt_value, config)
+        model_router.record(self.pipeline, route, time.perf_counter() - start)
+        with stage_timer(self.pipeline, "parse"):
+            return self.parser.invoke(message, config)
+
+
+def load_language_indexes():
+    """{lang: vectorstore} for every sub-index on disk, loaded together."""
+    if not os.path.isdir(LANG_INDEX_DIR):
+        return {}
+    return {name: load_vectorstore(os.path.join(LANG_INDEX_DIR, name))
+            for name in sorted(os.listdir(LANG_INDEX_DIR))
+            if os.path.isdir(os.path.join(LANG_INDEX_DIR, name))}
+
+
+def get_vectorstore(lang=None):
+    """The global index, or the sub-index for lang when one was built."""
+    partition = model_registry.get("vectorstore_languages").get(lang) if lang else None
+    return partition if partition is not None else model_registry.get("vectorstore")
+
+
+def embed_query(query):
+    with stage_timer("chat", "embed"):
+        return model_registry.get("vectorstore").embeddings.embed_query(query)
+
+
+def retrieve_documents(query, k=None, vector=None):
+    """
+    Same search as vectorstore.as_retriever(k=RETRIEVAL_K), split so embedding
+    and FAISS are timed apart, and keeping the (doc, similarity) pairs from
+    search_store for the model router.
+    Pass vector when the query was already embedded. k defaults to RETRIEVAL_K
+    as set when called, so a sweep can change it on the module.
+
+    The sub-index for the query's language is searched first; the global index
+    answers when there is none or its best hit is weak.
+    """
+    if k is None:
+        k = RETRIEVAL_K
+    if vector is None:
+        vector = embed_query(query)
+    global_store = model_registry.get("vectorstore")
+    lang = detect_language(query) if LANG_ROUTING else None
+    partition = get_vectorstore(lang)
+    if partition is not global_store:
+        docs = search_store(partition, vector, k)
+        best = max((score for _, score in docs if score is not None), default=None)
+        hit = len(docs) >= k and (best is None or best >= LANG_FALLBACK_RELEVANCE)
+        if metrics.ENABLED:
+            metrics.inc("retrieval_partition_total", lang=lang, outcome="hit" if hit else "fallback")
+        if hit:
+            return docs
+    return search_store(global_store, vector, k)
+
+
+def has_unit_vectors(vectorstore, sample=32):
+    """True when the index holds unit-length embeddings; checked once per store."""
+    unit = getattr(vectorstore, "_unit_vectors", None)
+    if unit is None:
+        index = vectorstore.index
+        n = min(sample, index.ntotal)
+        try:
+            norms = np.linalg.norm(index.reconstruct_n(0, n), axis=1)
+            unit = n > 0 and bool(np.allclose(norms, 1.0, atol=1e-3))
+        except RuntimeError:
+            # Index types that can't reconstruct vectors
+            unit = False
+        vectorstore._unit_vectors = unit
+    return unit
+
+
+def search_store(vectorstore, vector, k):
+    """
+    (doc, cosine similarity) pairs. FAISS returns squared L2 distances, which for
+    unit vectors are 2 - 2cos. An index built before embeddings were normalized
+    has no comparable similarity, so its scores are None.
+    """
+    unit = has_unit_vectors(vectorstore)
+    with stage_timer("chat", "faiss_search"):
+        scored = vectorstore.similarity_search_with_score_by_vector(vector, k=k)
+    return [(doc, 1 - distance / 2 if unit else None) for doc, distance in scored]
+
+
+def faq_versions():
+    # Answers made for other indexes, retrieval settings, prompt or model are
+    # ignored, so rebuilding vectorstore/db_faiss or its language sub-indexes,
+    # changing RETRIEVAL_K or editing CUSTOM_PROMPT_TEMPLATE invalidates them
+    return faq_cache.answer_versions(DB_FAISS_PATH, CUSTOM_PROMPT_TEMPLATE, DEFAULT_MODEL,
+                                     LANG_INDEX_DIR if LANG_ROUTING else None, RETRIEVAL_K)
+
+
+def load_faq_index():
+    return faq_cache.FAQIndex(faq_cache.FAQ_PATH, faq_versions())
+
+
+def faq_answer(user_text, history_str, vector):
+    """
+    A pre-generated answer for a near-identical frequent question in the same
+    language, or None. Only the first message of a chat is served unless
+    FAQ_WITH_HISTORY is set, since the stored answers saw no history.
+    """
+    if not faq_cache.FAQ_ENABLED or (history_str and not faq_cache.FAQ_WITH_HISTORY):
+        return None
+    # Crisis messages always get a fresh answer
+    if model_router.priority_class(user_text) == "crisis":
+        return None
+    with stage_timer("chat", "faq_lookup"):
+        match = model_registry.get("faq_index").lookup(vector, detect_language(user_text))
+    return match.answer if match else None
+
+
+def answer_message(user_text, history_str):
+    """Chat reply: the FAQ answer when one matches, else the QA chain on the same embedding."""
+    vector = embed_query(user_text)
+    cached = faq_answer(user_text, history_str, vector)
+    if cached is not None:
+        return cached
+    scored_docs = retrieve_documents(user_text, vector=vector)
+    return get_qa_chain().invoke({"query": user_text, "history": history_str, "scored_docs": scored_docs})
+
+
+def build_qa_chain():
+    prompt = set_custom_prompt(CUSTOM_PROMPT_TEMPLATE)
+
+    def prepare(x):
+        # Callers that already retrieved (the combined pipeline) pass scored_docs in
+        scored_docs = x["scored_docs"] if "scored_docs" in x else retrieve_documents(x["query"])
+        with stage_timer("chat", "format_context"):
+            context = "\n\n".join(doc.page_content for doc, _ in scored_docs)
+        return {"context": context, "question": x["query"], "history": x["history"],
+                "scores": [score for _, score in scored_docs]}
+
+    def choose_route(x):
+        return model_router.route_chat(x["question"], x["history"], x["scores"])
+
+    return RoutedChain("chat", prompt, choose_route, prepare)
+
+
+RELEVANCE_PROMPT = PromptTemplate(
+    template="Is the following text relevant to mental health, psychology, or emotional well-being? Answer only 'yes' or 'no'.\n\nText: {text}",
+    input_variables=["text"]
+)
+
+
+def build_relevance_chain():
+    return RoutedChain("relevance", RELEVANCE_PROMPT, lambda x: model_router.route_relevance())
+
+
+# Models are loaded once per process through the shared registry (thread-safe,
+# single-flight), so the unified inference server reuses them across services.
+# Unit-length embeddings, matching chatbot_create_memory_for_llm, so search distances map to cosine similarity
+model_registry.register("embedder", lambda: HuggingFaceEmbeddings(
+    model_name=EMBEDDING_MODEL, encode_kwargs={"normalize_embeddings": True}))
+model_registry.register("vectorstore", load_vectorstore)
+model_registry.register("vectorstore_languages", load_language_indexes)
+for _model in {model_router.LARGE_MODEL, model_router.SMALL_MODEL}:
+    model_registry.register(f"llm:{_model}", lambda m=_model: load_llm(m))
+model_registry.register("faq_index", load_faq_index)
+_qa_chain = model_registry.register("qa_chain", build_qa_chain)
+_relevance_chain = model_registry.register("relevance_chain", build_relevance_chain)
 
 
 def get_qa_chain():
-    global _qa_chain
-    with _init_lock:
-        if _qa_chain:
-            return _qa_chain
-        
-        vectorstore = load_vectorstore()
-        retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-        llm = load_llm()
-        prompt = set_custom_prompt(CUSTOM_PROMPT_TEMPLATE)
-
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
-
-        _qa_chain = (
-            {
-                "context": (lambda x: x["query"]) | retriever | format_docs,
-                "question": lambda x: x["query"],
-                "history": lambda x: x["history"]
-            }
-            | prompt
-            | llm
-            | StrOutputParser()
-        )
-        return _qa_chain
-
-
-app = Flask(__name__)
-CORS(app)
+    return _qa_chain.get()
+
+
+def get_relevance_chain():
+    return _relevance_chain.get()
+
+
+# Identical messages arriving together (push notifications, prompt chips) share one
+# embedding + FAISS + Groq round trip instead of each running their own
+_chat_flight = SingleFlight("chat")
+_relevance_flight = SingleFlight("relevance")
+
+_pipeline_executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline")
+
+
+# Routes live on a blueprint so inference_server can mount them next to the other services
+chat_bp = Blueprint("chat", __name__)
+
+def format_message(msg):
+    role = msg.get('role')
+    content = msg.get('content')
+    if role == 'user':
+        return f"User: {content}\n"
+    elif role == 'assistant':
+        return f"Assistant: {content}\n"
+    return ""
+
+
+def format_history(history_list):
+    return "".join(format_message(msg) for msg in history_list)
+
+
+def resolve_history(payload):
+    """
+    Returns (session, history_list, history_str) for a request.
+
+    Without a "session_id" key the request is stateless as before: the history
+    comes from the payload and session is None. With "session_id": null, or
+    with "history" sent alongside any id, a new session is started from that
+    history; ids are only ever minted here, so a client can't pick one that
+    belongs to someone else. With a known id and no history the stored,
+    already formatted history is used. An unknown or expired id raises
+    session_store.SessionExpired.
+    """
+    history_list = payload.get("history") or []
+    if "session_id" not in payload:
+        return None, history_list, format_history(history_list)
+
+    session_id = payload["session_id"]
+    if session_id and not history_list:
+        session = session_store.load(session_id)
+    else:
+        session = session_store.new_session()
+        session.extend(history_list, [format_message(m) for m in history_list])
+    return session, session.messages, session.history
+
+
+def remember_turn(session, user_text, reply=None):
+    """Stores the user's message, and the reply when there is one."""
+    turn = [{"role": "user", "content": user_text}]
+    if reply is not None:
+        turn.append({"role": "assistant", "content": reply})
+    session_store.append(session, turn, [format_message(m) for m in turn])
+
+
+def with_session(body, session):
+    if session is not None:
+        body["session_id"] = session.id
+    return body
+
+
+def request_priority():
+    payload = request.get_json(silent=True) or {}
+    return model_router.priority_class(payload.get("message") or "")
+
+
+def is_crisis_request():
+    # Crisis messages bypass the route caps; the LLM scheduler keeps slots for them
+    return request_priority() == "crisis"
+
+
+def overloaded_response(name):
+    resp = jsonify({"error": f"{name} is shed under load, retry shortly"})
+    resp.headers["Retry-After"] = "2"
+    return resp, 503
+
+
+def session_expired_response():
+    return jsonify({"error": "session expired, resend history", "session_expired": True}), 409
+
+
+def llm_unavailable_response(e):
+    # Provider throttling: tell the caller to retry rather than storing an error as the reply
+    resp = jsonify({"error": "assistant is busy, please retry"})
+    resp.headers["Retry-After"] = str(max(1, round(e.retry_after)))
+    return resp, 503
+
 
 s3 = boto3.client(
     's3',
@@ -94,44 +387,52 @@ s3 = boto3.client(
 )
 
 
-@app.route("/api/chat/message", methods=["POST"])
+@chat_bp.route("/api/chat/message", methods=["POST"])
+@limit_concurrency("chat", 16, exempt=is_crisis_request)
 def chat_message():
     """
-    Accepts JSON: { "message": "<user text>" }
+    Accepts JSON: { "message": "<user text>", "history": [...] }
     Returns JSON: { "reply": "<assistant text>" }
-    Stateless endpoint — doesn't store any conversation.
+    Stateless unless the caller opts into a server-side session with
+    "session_id" (see resolve_history); the response then carries "session_id"
+    and later requests need only the new message. An expired session gets a
+    409 with "session_expired": true, and the client resends its history.
     """
     payload = request.get_json(silent=True) or {}
     user_text = (payload.get("message") or "").strip()
-    history_list = payload.get("history") or []
-
-    history_str = ""
-    for msg in history_list:
-        role = msg.get('role')
-        content = msg.get('content')
-        if role == 'user':
-            history_str += f"User: {content}\n"
-        elif role == 'assistant':
-            history_str += f"Assistant: {content}\n"
 
     if not user_text:
         return jsonify({"error": "message required"}), 400
 
-    qa = get_qa_chain()
+    with stage_timer("chat", "history_format"):
+        try:
+            session, _, history_str = resolve_history(payload)
+        except session_store.SessionExpired:
+            return session_expired_response()
+
     try:
         # Use the chain to generate a reply. API may return dict or string depending on chain.
-        resp = qa.invoke({"query": user_text, "history": history_str})
+        with priority_scope(model_router.priority_class(user_text)):
+            resp = _chat_flight.do(request_key(user_text, history_str),
+                                   lambda: answer_message(user_text, history_str))
         assistant_text = (resp.get("result") if isinstance(
             resp, dict) else str(resp)) or ""
+    except LLMUnavailable as e:
+        print(f"Chat LLM unavailable: {e}")
+        return llm_unavailable_response(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
-        assistant_text = f"Error generating response: {str(e)}"
+        # Error text is returned but kept out of the session history
+        return jsonify(with_session({"reply": f"Error generating response: {str(e)}"}, session))
 
-    return jsonify({"reply": assistant_text})
+    if session is not None:
+        remember_turn(session, user_text, assistant_text)
+    return jsonify(with_session({"reply": assistant_text}, session))
 
 
-@app.route("/api/chat/check-relevance", methods=["POST"])
+@chat_bp.route("/api/chat/check-relevance", methods=["POST"])
+@limit_concurrency("relevance", 8)
 def check_relevance():
     payload = request.get_json(silent=True) or {}
     user_text = (payload.get("message") or "").strip()
@@ -139,21 +440,194 @@ def check_relevance():
     if not user_text:
         return jsonify({"reply": "no"})
 
-    llm = load_llm()
-    prompt = PromptTemplate(
-        template="Is the following text relevant to mental health, psychology, or emotional well-being? Answer only 'yes' or 'no'.\n\nText: {text}",
-        input_variables=["text"]
-    )
-    chain = prompt | llm | StrOutputParser()
+    chain = get_relevance_chain()
     
     try:
-        result = chain.invoke({"text": user_text})
+        # Relevance checks are the first LLM work shed under load; the caller
+        # gets a 503 to retry rather than a "no" it would take as an answer
+        with priority_scope("background"):
+            result = _relevance_flight.do(request_key(user_text), lambda: chain.invoke({"text": user_text}))
         return jsonify({"reply": result.strip().lower()})
-    except:
+    except LLMUnavailable as e:
+        return llm_unavailable_response(e)
+    except Exception as e:
+        print(f"Relevance check failed: {e}")
         return jsonify({"reply": "no"})
 
 
-@app.route("/api/chat/message-audio", methods=["POST"])
+def is_relevant(text):
+    """
+    The relevance check runs at the message's own priority, so it is never shed
+    ahead of the reply it gates. A check that fails (shed, throttled, upstream
+    error) counts as relevant: a missing answer is worse than an extra one.
+    """
+    try:
+        with priority_scope(model_router.priority_class(text)):
+            result = _relevance_flight.do(request_key(text), lambda: get_relevance_chain().invoke({"text": text}))
+        return "yes" in result.strip().lower()
+    except Exception as e:
+        print(f"Relevance check failed, treating as relevant: {e}")
+        return True
+
+
+def detect_emotion(text):
+    import video_recommender
+    from emotion_detector import detect_emotion_tiered
+    label, tier = detect_emotion_tiered(text, video_recommender.detect_emotion_model)
+    return {"label": label, "tier": tier}
+
+
+def embed_and_retrieve(text):
+    vector = embed_query(text)
+    return vector, retrieve_documents(text, vector=vector)
+
+
+@chat_bp.route("/api/chat/pipeline", methods=["POST"])
+@limit_concurrency("pipeline", 8, exempt=is_crisis_request)
+def chat_pipeline():
+    """
+    Everything the backend needs for one user message in a single call, instead
+    of check-relevance, message and recommend-videos one after another.
+
+    Accepts JSON: { "message": "<user text>", "history": [...], "session_id": ...,
+                    "reply": true, "videos": false, "scales": true, "gate_reply": true }
+    Returns JSON: { "relevant": bool, "reply": str|null, "emotion": {"label", "tier"},
+                    "scales": {...}|null, "videos": [...]|null, "partial": bool,
+                    "retry_after": int|null }
+
+    Relevance, retrieval, emotion detection and scale scoring run concurrently on
+    the pipeline's own pool (PIPELINE_WORKERS). Generation starts as soon as
+    relevance passes; with gate_reply=false it starts when retrieval is back and
+    relevance only gates the videos. Irrelevant messages get "reply": null when
+    gated; crisis messages are never gated, and a failed relevance check counts
+    as relevant. A stage that failed comes back null and "partial" is true
+    when a requested stage failed or the video list is incomplete. When the
+    LLM is throttled the rest still comes back, with "reply": null and
+    "retry_after" (also sent as Retry-After) saying when to ask for the reply
+    again. Sessions work as for /api/chat/message; when no reply is generated
+    the user's message is still stored, unless the reply is to be retried.
+    """
+    payload = request.get_json(silent=True) or {}
+    user_text = (payload.get("message") or "").strip()
+    want_reply = payload.get("reply", True)
+    want_videos = payload.get("videos", False)
+    want_scales = payload.get("scales", True)
+    gate_reply = payload.get("gate_reply", True)
+
+    if not user_text:
+        return jsonify({"error": "message required"}), 400
+
+    with stage_timer("pipeline", "history_format"):
+        try:
+            session, history_list, history_str = resolve_history(payload)
+        except session_store.SessionExpired:
+            return session_expired_response()
+    user_messages = [m.get("content") or "" for m in history_list if m.get("role") == "user"] + [user_text]
+
+    # Only leaf tasks go to the pool; this thread does the waiting, so a busy pool can't deadlock on itself
+    executor = _pipeline_executor
+    relevance_f = executor.submit(timed("pipeline", "relevance", is_relevant), user_text)
+    emotion_f = executor.submit(timed("pipeline", "emotion", detect_emotion), user_text)
+    retrieval_f = executor.submit(embed_and_retrieve, user_text) if want_reply else None
+    scales_f = executor.submit(timed("pipeline", "scales", scale_detection.estimate_scores_incremental),
+                               user_messages) if want_scales else None
+
+    relevant = relevance_f.result()
+    try:
+        emotion = emotion_f.result()
+    except Exception as e:
+        print(f"Emotion detection failed: {e}")
+        emotion = None
+
+    videos_f = None
+    if want_videos and relevant:
+        import video_recommender
+        videos_f = executor.submit(
+            timed("pipeline", "videos", video_recommender.recommend_videos_detailed),
+            [{"role": "user", "content": user_text}], None, emotion["label"] if emotion else None)
+
+    # Crisis messages always get a reply, whatever the relevance check said
+    priority = model_router.priority_class(user_text)
+    reply, retry_after = None, None
+    if want_reply and (relevant or priority == "crisis" or not gate_reply):
+        try:
+            vector, scored_docs = retrieval_f.result()
+            resp = faq_answer(user_text, history_str, vector)
+            if resp is None:
+                with priority_scope(priority):
+                    resp = get_qa_chain().invoke({"query": user_text, "history": history_str,
+                                                  "scored_docs": scored_docs})
+            reply = (resp.get("result") if isinstance(resp, dict) else str(resp)) or ""
+            if session is not None:
+                remember_turn(session, user_text, reply)
+        except LLMUnavailable as e:
+            # The other stages are still worth returning; the caller retries only the reply
+            print(f"Pipeline LLM unavailable: {e}")
+            retry_after = max(1, round(e.retry_after))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            reply = f"Error generating response: {str(e)}"
+    elif session is not None:
+        # No reply to pair it with, but later turns still need the user's message
+        remember_turn(session, user_text)
+
+    videos, partial = None, False
+    if videos_f is not None:
+        try:
+            videos, complete = videos_f.result()
+            partial = not complete
+        except Exception as e:
+            # null rather than [] so callers keep their cached recommendations
+            print(f"Pipeline video recommendation failed: {e}")
+            partial = True
+
+    scales = None
+    if scales_f is not None:
+        try:
+            scales = scales_f.result()
+        except Exception as e:
+            print(f"Pipeline scale scoring failed: {e}")
+            partial = True
+
+    resp = jsonify(with_session({
+        "relevant": relevant,
+        "reply": reply,
+        "emotion": emotion,
+        "scales": scales,
+        "videos": videos,
+        "partial": partial or retry_after is not None,
+        "retry_after": retry_after,
+    }, session))
+    if retry_after is not None:
+        resp.headers["Retry-After"] = str(retry_after)
+    return resp
+
+
+@chat_bp.route("/api/chat/session/<session_id>", methods=["DELETE"])
+def delete_session(session_id):
+    session_store.delete(session_id)
+    return jsonify({"deleted": session_id})
+
+
+@chat_bp.route("/api/chat/session-stats", methods=["GET"])
+def session_stats():
+    return jsonify(session_store.stats())
+
+
+@chat_bp.route("/api/chat/coalescing-stats", methods=["GET"])
+def coalescing_stats():
+    return jsonify({"chat": _chat_flight.stats(), "relevance": _relevance_flight.stats()})
+
+
+@chat_bp.route("/api/chat/llm-stats", methods=["GET"])
+def llm_stats():
+    return jsonify({"gateways": gateway_stats(), "routes": model_router.route_stats(),
+                    "faq": model_registry.get("faq_index").stats()})
+
+
+@chat_bp.route("/api/chat/message-audio", methods=["POST"])
+@limit_concurrency("audio", 4)
 def post_message_audio():
     data = request.get_json(silent=True) or {}
     user_text = data.get("message", "").strip()
@@ -162,26 +636,32 @@ def post_message_audio():
     if not user_text:
         return jsonify({"error": "message required"}), 400
 
+    # Audio is optional for the client; skip it while the LLM queues are backed up
+    if should_shed("background"):
+        return overloaded_response("audio")
+
     try:
         # Generate the TTS audio
         from gtts import gTTS
         import traceback
 
-        mp = BytesIO()
-        gTTS(user_text).write_to_fp(mp)
-        mp.seek(0)
-        audio_bytes = mp.getvalue()
+        with stage_timer("audio", "tts"):
+            mp = BytesIO()
+            gTTS(user_text).write_to_fp(mp)
+            mp.seek(0)
+            audio_bytes = mp.getvalue()
 
         # Upload to S3
         key = f"chatbot-messages/{message_id}.mp3"
         bucket_name = os.getenv("AWS_S3_BUCKET_NAME")
 
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=key,
-            Body=audio_bytes,
-            ContentType="audio/mpeg"
-        )
+        with stage_timer("audio", "s3_upload"):
+            s3.put_object(
+                Bucket=bucket_name,
+                Key=key,
+                Body=audio_bytes,
+                ContentType="audio/mpeg"
+            )
 
         # Return public S3 URL
         audio_url = f"https://s3.{os.getenv('AWS_REGION')}.amazonaws.com/{bucket_name}/{key}"
@@ -197,6 +677,18 @@ def post_message_audio():
         }), 500
 
 
+def create_app():
+    """The standalone chat service; inference_server mounts chat_bp instead."""
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(chat_bp)
+    # CHATBOT_PRELOAD=1 loads the embedder, FAISS index and LLM client at boot
+    add_health_routes(app, "CHATBOT_PRELOAD")
+    add_metrics_routes(app)
+    add_memory_routes(app)
+    add_response_layer(app)
+    return app
+
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 4001)))
+    create_app().run(host="0.0.0.0", port=int(os.getenv("PORT", 4001)))
@@ -1,8 +1,12 @@
+import os
+import shutil
 from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
+from language import detect_language
+
 # Step 1: Load raw PDF(s)
 DATA_PATH = "data/"
 
@@ -15,10 +19,13 @@ def load_pdf_files(data):
 
 documents = load_pdf_files(data=DATA_PATH)
 
-# Step 2: Create Chunks
+# Step 2: Create Chunks (tune with benchmarks/retrieval_sweep.py)
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 500))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 50))
+
 def create_chunks(extracted_data):
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500,
-                                                  chunk_overlap=50)
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE,
+                                                  chunk_overlap=CHUNK_OVERLAP)
     text_chunks = text_splitter.split_documents(extracted_data)
     return text_chunks
 
@@ -26,14 +33,42 @@ text_chunks = create_chunks(extracted_data=documents)
 
 # Step 3: Create Vector Embeddings (multilingual XLM-R based sentence-transformer)
 def get_embedding_model():
-    embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/paraphrase-xlm-r-multilingual-v1")
+    # Unit-length vectors: chatbot_apis turns search distances into cosine similarity
+    embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/paraphrase-xlm-r-multilingual-v1",
+                                            encode_kwargs={"normalize_embeddings": True})
     return embedding_model
 
 embedding_model = get_embedding_model()
 
-# Step 4: Store embeddings in FAISS
+# Step 4: Tag every chunk with its language
+for chunk in text_chunks:
+    chunk.metadata["lang"] = detect_language(chunk.page_content)
+
+# Step 5: Embed once, then store the global FAISS index plus one sub-index per
+# language with enough chunks (vectorstore/db_faiss_lang/<lang>)
 DB_FAISS_PATH = "vectorstore/db_faiss"
-db = FAISS.from_documents(text_chunks, embedding_model)
-db.save_local(DB_FAISS_PATH)
+LANG_INDEX_DIR = "vectorstore/db_faiss_lang"
+MIN_PARTITION_CHUNKS = 20
 
+texts = [chunk.page_content for chunk in text_chunks]
+metadatas = [chunk.metadata for chunk in text_chunks]
+vectors = embedding_model.embed_documents(texts)
+
+db = FAISS.from_embeddings(list(zip(texts, vectors)), embedding_model, metadatas=metadatas)
+db.save_local(DB_FAISS_PATH)
 print(f"Saved FAISS vectorstore to {DB_FAISS_PATH}")
+
+# Rebuilt from scratch so a language that fell below the threshold loses its old sub-index
+shutil.rmtree(LANG_INDEX_DIR, ignore_errors=True)
+by_lang = {}
+for i, meta in enumerate(metadatas):
+    by_lang.setdefault(meta["lang"], []).append(i)
+
+for lang, ids in sorted(by_lang.items()):
+    if lang == "und" or len(ids) < MIN_PARTITION_CHUNKS:
+        print(f"Language {lang}: {len(ids)} chunks, served from the global index only")
+        continue
+    part = FAISS.from_embeddings([(texts[i], vectors[i]) for i in ids], embedding_model,
+                                 metadatas=[metadatas[i] for i in ids])
+    part.save_local(f"{LANG_INDEX_DIR}/{lang}")
+    print(f"Saved {lang} sub-index ({len(ids)} chunks) to {LANG_INDEX_DIR}/{lang}")
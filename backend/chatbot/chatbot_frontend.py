@@ -10,6 +10,8 @@ from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
 
+from conversation_store import ConversationLog
+
 load_dotenv()
 DB_FAISS_PATH = "vectorstore/db_faiss"
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -92,9 +94,9 @@ def process_query(user_query):
     return response["result"]
 
 
-def save_conversation(messages):
-    with open("conversation.json", "w", encoding="utf-8") as f:
-        json.dump(messages, f, ensure_ascii=False, indent=2)
+def save_conversation(messages, chat_id=None):
+    # Appends only the new turns to conversation.jsonl instead of rewriting the whole chat
+    ConversationLog().sync(messages, chat_id)
 
 def main():
     st.set_page_config(page_title="Welli", layout="wide")
@@ -152,7 +154,7 @@ def main():
             st.audio(audio_bytes, format='audio/mp3')
 
             # Save conversation
-            save_conversation(messages)
+            save_conversation(messages, st.session_state.current_chat)
 
     # --- Handle typed text ---
     if user_text:
@@ -167,7 +169,7 @@ def main():
         st.audio(audio_bytes, format='audio/mp3')
 
         # Save conversation
-        save_conversation(messages)
+        save_conversation(messages, st.session_state.current_chat)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+import re
+import hashlib
+from threading import Event, Lock
+
+import metrics
+
+
+def request_key(message, history=""):
+    """Case/whitespace-insensitive message plus a hash of the formatted history."""
+    normalized = re.sub(r"\s+", " ", message).strip().lower()
+    history_hash = hashlib.sha1(history.encode("utf-8")).hexdigest() if history else ""
+    return f"{normalized}\x00{history_hash}"
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight computations: the first caller for a key runs
+    fn, callers arriving while it runs wait and receive the same result (or
+    exception). Nothing is cached once the call finishes.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _count(self, coalesced):
+        with self._lock:
+            if coalesced:
+                self.coalesced += 1
+            else:
+                self.leaders += 1
+        if metrics.ENABLED:
+            metrics.inc("singleflight_requests_total", flight=self.name,
+                        role="follower" if coalesced else "leader")
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self._count(not leader)
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            # Any exit without a result, or followers would return None as if it were one
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_share": round(self.coalesced / total, 4) if total else 0.0,
+            }
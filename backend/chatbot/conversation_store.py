@@ -0,0 +1,241 @@
+import os
+import json
+import struct
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in one process are serialized
+    fcntl = None
+
+# Append-only chat log shared by the Streamlit frontends: one JSON message per
+# line after a header line, plus a fixed-width offset index so readers can tail
+# the last N messages (or only user messages) without parsing the whole log.
+LOG_PATH = os.getenv("CONVERSATION_LOG", "conversation.jsonl")
+# The whole-file JSON list written before the log existed
+LEGACY_PATH = "conversation.json"
+
+FORMAT = "welli-conversation"
+VERSION = 1
+
+# One index entry per message: byte offset and length of its line, and its role
+_ENTRY = struct.Struct("<QIB")
+_ROLES = {"user": 1, "assistant": 2}
+
+# Writers are serialized per log path across every ConversationLog in the
+# process, and across processes (the Streamlit frontends) by a lock file
+_path_locks_guard = Lock()
+_path_locks = {}
+
+
+@contextmanager
+def _write_lock(path):
+    with _path_locks_guard:
+        lock = _path_locks.setdefault(os.path.abspath(path), Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path + ".lock", "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_legacy_json(path=LEGACY_PATH) -> List[Dict]:
+    """Messages from the old conversation.json format (a JSON list of {role, content})."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    return [m for m in data if isinstance(m, dict) and "role" in m]
+
+
+def _encode(obj) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class ConversationLog:
+    """
+    The messages of the active chat, appended one line at a time. Starting a
+    different chat rewrites the log once; every other save only appends what
+    is new. The index is rebuilt from the log tail if a crash left it behind.
+    Until the first write a legacy conversation.json is read in its place;
+    the first append migrates it.
+    """
+
+    def __init__(self, path=LOG_PATH, legacy_path=LEGACY_PATH):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.legacy_path = legacy_path
+
+    def _legacy(self) -> List[Dict]:
+        return read_legacy_json(self.legacy_path) if self.legacy_path else []
+
+    def _header(self) -> Dict:
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(f.readline() or b"{}")
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @property
+    def chat_id(self) -> Optional[str]:
+        return self._header().get("chat")
+
+    def _tail(self, repair=False):
+        """
+        (indexed, last, missing): how many entries the index holds, the last of
+        them, and entries for log lines the index is missing. Reads only the
+        end of the index, so a save doesn't pay for the whole history.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0, None, []
+        try:
+            with open(self.index_path, "rb") as f:
+                index_size = os.fstat(f.fileno()).st_size
+                indexed = index_size // _ENTRY.size
+                last = None
+                if indexed:
+                    f.seek((indexed - 1) * _ENTRY.size)
+                    last = _ENTRY.unpack(f.read(_ENTRY.size))
+        except FileNotFoundError:
+            index_size, indexed, last = 0, 0, None
+
+        missing = []
+        with open(self.path, "rb") as f:
+            end = last[0] + last[1] if last else len(f.readline())
+            f.seek(end)
+            for line in f if end < size else ():
+                if not line.endswith(b"\n"):
+                    break  # torn write; the writer truncates it
+                role = json.loads(line).get("role")
+                missing.append((end, len(line), _ROLES.get(role, 0)))
+                end += len(line)
+
+        if repair and (end < size or missing or index_size != indexed * _ENTRY.size):
+            with open(self.path, "ab") as f:
+                f.truncate(end)
+            with open(self.index_path, "ab") as f:
+                f.truncate(indexed * _ENTRY.size)
+                f.write(b"".join(_ENTRY.pack(*e) for e in missing))
+        return indexed, last, missing
+
+    def _entries(self) -> List[tuple]:
+        """All index entries, plus any the log has that the index is missing."""
+        indexed, _, missing = self._tail()
+        if not indexed:
+            return missing
+        with open(self.index_path, "rb") as f:
+            raw = f.read(indexed * _ENTRY.size)
+        return [_ENTRY.unpack_from(raw, i) for i in range(0, len(raw), _ENTRY.size)] + missing
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return len(self._legacy())
+        indexed, _, missing = self._tail()
+        return indexed + len(missing)
+
+    def _read(self, entries) -> List[Dict]:
+        if not entries:
+            return []
+        messages = []
+        with open(self.path, "rb") as f:
+            for offset, length, _ in entries:
+                f.seek(offset)
+                messages.append(json.loads(f.read(length)))
+        return messages
+
+    def read(self, last: Optional[int] = None, role: Optional[str] = None) -> List[Dict]:
+        """Messages in order, optionally only one role and only the last N of them."""
+        if not os.path.exists(self.path):
+            messages = self._legacy()
+            if role is not None:
+                messages = [m for m in messages if m.get("role") == role]
+            if last is not None:
+                messages = messages[-last:] if last > 0 else []
+            return messages
+        entries = self._entries()
+        if role is not None:
+            entries = [e for e in entries if e[2] == _ROLES.get(role)]
+        if last is not None:
+            entries = entries[-last:] if last > 0 else []
+        return self._read(entries)
+
+    def append(self, messages: List[Dict]):
+        with _write_lock(self.path):
+            if not os.path.exists(self.path):
+                legacy = self._legacy()
+                self._write_new("legacy" if legacy else None, legacy + list(messages))
+                return
+            self._tail(repair=True)
+            self._append(messages)
+
+    def _append(self, messages):
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            lines, new_entries = [], []
+            for m in messages:
+                line = _encode(m)
+                new_entries.append((offset, len(line), _ROLES.get(m.get("role"), 0)))
+                lines.append(line)
+                offset += len(line)
+            # Log first, then index: a crash in between is repaired from the log
+            f.write(b"".join(lines))
+        with open(self.index_path, "ab") as f:
+            f.write(b"".join(_ENTRY.pack(*e) for e in new_entries))
+
+    def _write_new(self, chat_id, messages):
+        tmp = self.path + ".tmp"
+        header = _encode({"format": FORMAT, "version": VERSION, "chat": chat_id})
+        with open(tmp, "wb") as f:
+            f.write(header)
+        with open(self.index_path, "wb"):
+            pass
+        os.replace(tmp, self.path)
+        self._append(messages)
+
+    def reset(self, chat_id=None, messages=()):
+        """Starts the log over for another chat."""
+        with _write_lock(self.path):
+            self._write_new(chat_id, list(messages))
+
+    def sync(self, messages: List[Dict], chat_id=None):
+        """
+        Persists a chat's full message list, appending only the messages the log
+        does not have yet. A different chat, or a list that no longer extends
+        the stored one, rewrites the log.
+        """
+        with _write_lock(self.path):
+            indexed, last, missing = self._tail(repair=True)
+            stored = indexed + len(missing)
+            last = missing[-1] if missing else last
+            same_chat = os.path.exists(self.path) and self._header().get("chat") == chat_id
+            if same_chat and stored <= len(messages) and (
+                    not stored or self._read([last])[0] == messages[stored - 1]):
+                self._append(messages[stored:])
+            else:
+                self._write_new(chat_id, list(messages))
+
+
+def load_messages(path=LOG_PATH, last=None, role=None) -> List[Dict]:
+    """Reads the log, or a legacy conversation.json when given one."""
+    if path.endswith(".json"):
+        messages = read_legacy_json(path)
+        if role is not None:
+            messages = [m for m in messages if m.get("role") == role]
+        if last is not None:
+            messages = messages[-last:] if last > 0 else []
+        return messages
+    return ConversationLog(path).read(last=last, role=role)
+
+
+def load_user_messages(path=LOG_PATH, last=None) -> List[str]:
+    return [m["content"] for m in load_messages(path, last=last, role="user")]
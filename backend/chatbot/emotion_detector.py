@@ -0,0 +1,94 @@
+import os
+import re
+import time
+from threading import Lock
+from typing import Callable, Dict, List, Tuple
+
+from scale_detection import PHQ9_ITEMS, GAD7_ITEMS, GHQ12_ITEMS, compile_keywords
+
+# Tier 1 answers only when this share of lexicon hits agrees on one emotion
+MIN_CONFIDENCE = float(os.getenv("EMOTION_LEXICON_CONFIDENCE", 0.75))
+FAST_PATH_ENABLED = os.getenv("EMOTION_FAST_PATH", "1") == "1"
+
+# Like scale_detection.NEGATION_PATTERN, but also catches contractions ("don't", "isn't")
+NEGATION_PATTERN = re.compile(r"\b(?:no|not|never|none|without|nothing)\b|n't\b", flags=re.I)
+
+# Scale keywords that say nothing about the emotion on their own ("pleasure",
+# "blue", "tense" appear in both positive and negative sentences; "content" is
+# usually the noun, "pressure" is often blood pressure, and "satisfied" and
+# "pleased" come up mostly as "not satisfied" in these chats)
+AMBIGUOUS = {"pleasure", "blue", "tense", "restless", "uneasy", "decision", "uncertain", "down",
+             "content", "pressure", "satisfied", "pleased"}
+
+
+def _items(scale: Dict[int, List[str]], numbers: List[int]) -> List[str]:
+    return [kw for no in numbers for kw in scale[no] if kw not in AMBIGUOUS]
+
+
+# Labels match j-hartmann/emotion-english-distilroberta-base so both tiers are interchangeable
+EMOTION_LEXICON = {
+    "sadness": _items(PHQ9_ITEMS, [1, 2, 6, 9]) + _items(GHQ12_ITEMS, [8, 10]) + [
+        "lonely", "alone", "crying", "cried", "heartbroken", "grief", "empty", "numb", "lost someone"],
+    "fear": _items(GAD7_ITEMS, [1, 2, 3, 7]) + _items(GHQ12_ITEMS, [5]) + [
+        "afraid", "panic attack", "dread", "phobia", "stress", "exam pressure", "under pressure", "peer pressure"],
+    "anger": _items(GAD7_ITEMS, [6]) + [
+        "angry", "anger", "furious", "rage", "mad at", "hate", "annoyed", "irritated", "pissed"],
+    "joy": _items(GHQ12_ITEMS, [11]) + [
+        "excited", "grateful", "great day", "feeling good", "feel good", "proud", "relieved", "love it"],
+    "disgust": ["disgusted", "disgusting", "gross", "sick of", "revolting", "repulsed"],
+    "surprise": ["surprised", "shocked", "unexpected", "can't believe", "suddenly"],
+}
+
+_COMPILED = {label: compile_keywords(words) for label, words in EMOTION_LEXICON.items()}
+
+_stats_lock = Lock()
+_stats = {"lexicon": 0, "model": 0, "lexicon_seconds": 0.0, "model_seconds": 0.0}
+
+
+def classify_lexicon(text: str) -> Tuple[str, float]:
+    """
+    Returns (label, confidence) from keyword hits, or (None, 0.0) when nothing matched.
+    Any negated hit ("not happy") zeroes the confidence: negation flips meaning and
+    is left to the model.
+    """
+    counts = {}
+    for label, pattern in _COMPILED.items():
+        for match in pattern.finditer(text):
+            if NEGATION_PATTERN.search(text[max(match.start() - 20, 0):match.start()]):
+                return None, 0.0
+            counts[label] = counts.get(label, 0) + 1
+    if not counts:
+        return None, 0.0
+    label = max(counts, key=counts.get)
+    return label, counts[label] / sum(counts.values())
+
+
+def _record(tier: str, seconds: float):
+    with _stats_lock:
+        _stats[tier] += 1
+        _stats[f"{tier}_seconds"] += seconds
+
+
+def detect_emotion_tiered(text: str, model_fn: Callable[[str], str]) -> Tuple[str, str]:
+    """
+    Returns (label, tier). The lexicon answers when it is confident; otherwise
+    model_fn (the transformer pipeline) decides.
+    """
+    start = time.perf_counter()
+    if FAST_PATH_ENABLED:
+        label, confidence = classify_lexicon(text)
+        if label and confidence >= MIN_CONFIDENCE:
+            _record("lexicon", time.perf_counter() - start)
+            return label, "lexicon"
+    label = model_fn(text)
+    _record("model", time.perf_counter() - start)
+    return label, "model"
+
+
+def tier_stats() -> Dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["lexicon"] + stats["model"]
+    stats["total"] = total
+    stats["lexicon_share"] = round(stats["lexicon"] / total, 4) if total else 0.0
+    return stats
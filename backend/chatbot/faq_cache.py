@@ -0,0 +1,152 @@
+import os
+import re
+import json
+import base64
+import hashlib
+from threading import Lock
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+import metrics
+from language import detect_language
+
+# Answers pre-generated by faq_pregenerate.py, one JSON record per line
+FAQ_PATH = os.getenv("FAQ_PATH", "vectorstore/faq_answers.jsonl")
+FAQ_ENABLED = os.getenv("FAQ_ENABLED", "1") == "1"
+# Cosine similarity a message needs to a stored question to reuse its answer
+FAQ_MIN_SIMILARITY = float(os.getenv("FAQ_MIN_SIMILARITY", 0.9))
+# Stored answers were generated without history; by default they only serve
+# the first message of a chat, where that matches what the LLM would see.
+# Later turns always go to the LLM, so the hit rate is bounded by how many
+# chats open with a frequent question.
+FAQ_WITH_HISTORY = os.getenv("FAQ_WITH_HISTORY", "0") == "1"
+
+
+def normalize_question(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def file_digest(path):
+    """sha256 over a file, or over every file in a directory (names included)."""
+    digest = hashlib.sha256()
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    for p in paths:
+        digest.update(os.path.relpath(p, path).encode("utf-8"))
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def answer_versions(index_path, prompt_template, model, lang_index_path=None, k=None):
+    """
+    What an answer depends on; entries recorded under other versions are stale.
+    lang_index_path is the per-language sub-index directory retrieval tries
+    first (None when language routing is off) and k the chunks retrieved.
+    """
+    return {
+        "index": file_digest(index_path) if os.path.exists(index_path) else "missing",
+        "lang_index": (file_digest(lang_index_path) if os.path.isdir(lang_index_path) else "missing")
+        if lang_index_path else "off",
+        "k": k,
+        "prompt": hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()[:16],
+        "model": model,
+    }
+
+
+def encode_vector(vector):
+    # float16 + base64 keeps a 768-d embedding near 2 KB per record
+    return base64.b64encode(np.asarray(vector, dtype=np.float16).tobytes()).decode("ascii")
+
+
+def decode_vector(data):
+    return np.frombuffer(base64.b64decode(data), dtype=np.float16).astype(np.float32)
+
+
+def read_records(path=FAQ_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a torn last line from an interrupted job
+    except FileNotFoundError:
+        return
+
+
+def record_language(record):
+    # Records written before answers were tagged get the question's script
+    return record.get("lang") or detect_language(record["question"])
+
+
+class FAQMatch(NamedTuple):
+    question: str
+    answer: str
+    similarity: float
+
+
+class FAQIndex:
+    """
+    In-memory matrix of the current-version question embeddings. Reloads when
+    the answers file changes, so a running server picks up a batch job's output.
+    The multilingual embedder puts a question and its translation close
+    together, so lookups only consider answers in the message's language.
+    """
+
+    def __init__(self, path, versions):
+        self.path = path
+        self.versions = versions
+        self._lock = Lock()
+        self._mtime = None
+        self._matrix = None
+        self._langs = None
+        self._entries = []
+        self.stale = 0
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        latest, stale = {}, 0
+        for record in read_records(self.path):
+            if record.get("versions") != self.versions:
+                stale += 1
+                continue
+            latest[normalize_question(record["question"])] = record
+        entries = list(latest.values())
+        matrix = langs = None
+        if entries:
+            matrix = np.vstack([decode_vector(r["embedding"]) for r in entries])
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            langs = np.array([record_language(r) for r in entries])
+        self._entries, self._matrix, self._langs, self._mtime, self.stale = entries, matrix, langs, mtime, stale
+
+    def lookup(self, vector, lang, min_similarity=FAQ_MIN_SIMILARITY) -> Optional[FAQMatch]:
+        """The closest stored answer written in `lang`, if it is similar enough."""
+        with self._lock:
+            self._refresh()
+            matrix, langs, entries = self._matrix, self._langs, self._entries
+        if matrix is None:
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-12)
+        similarities = np.where(langs == lang, matrix @ query, -np.inf)
+        best = int(np.argmax(similarities))
+        match = None
+        if similarities[best] >= min_similarity:
+            match = FAQMatch(entries[best]["question"], entries[best]["answer"], float(similarities[best]))
+        if metrics.ENABLED:
+            metrics.inc("faq_lookups_total", outcome="hit" if match else "miss")
+        return match
+
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            return {"path": self.path, "entries": len(self._entries), "stale": self.stale,
+                    "versions": self.versions}
@@ -0,0 +1,142 @@
+"""
+Pre-generates answers for frequent questions so /api/chat/message can serve
+them without an LLM call (see faq_cache).
+
+    python faq_pregenerate.py --questions faq.txt
+    python faq_pregenerate.py --from-log conversation.jsonl --min-count 3 --top 200
+
+--questions takes one question per line (or JSONL with a "question" field);
+--from-log mines user messages from JSONL logs (the conversation log, or
+exported chat messages with "content", "promptText" or "message") and keeps
+the most frequent ones. Each answer is appended to FAQ_PATH as soon as it is
+ready, so an interrupted run resumes where it stopped: questions that already
+have an answer for the current index/prompt/model version are skipped.
+
+Answers are tagged with the question's language and only served to messages
+in that language, and only as the first message of a chat (see faq_cache).
+"""
+import json
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+
+import faq_cache
+from language import detect_language
+
+
+class Pacer:
+    """Spaces calls at least 60/rpm seconds apart across threads, leaving Groq budget for live traffic."""
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm
+        self._lock = Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(max(0.0, start - now))
+
+
+def read_questions(path):
+    questions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                line = json.loads(line).get("question", "")
+            questions.append(line)
+    return questions
+
+
+def mine_questions(paths, min_count=2, top=None):
+    """Most frequent user messages across JSONL logs, by normalized text."""
+    counts, first_seen = Counter(), {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("role", "user") != "user":
+                    continue
+                text = record.get("content") or record.get("promptText") or record.get("message")
+                if not text:
+                    continue
+                key = faq_cache.normalize_question(text)
+                counts[key] += 1
+                first_seen.setdefault(key, text.strip())
+    frequent = [(key, n) for key, n in counts.most_common(top) if n >= min_count]
+    return [first_seen[key] for key, _ in frequent]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions")
+    parser.add_argument("--from-log", nargs="+", default=[])
+    parser.add_argument("--min-count", type=int, default=2)
+    parser.add_argument("--top", type=int)
+    parser.add_argument("--out", default=faq_cache.FAQ_PATH)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=20)
+    args = parser.parse_args()
+
+    questions = read_questions(args.questions) if args.questions else []
+    if args.from_log:
+        questions += mine_questions(args.from_log, args.min_count, args.top)
+    if not questions:
+        parser.error("no questions: pass --questions and/or --from-log")
+
+    import chatbot_apis
+    import model_router
+
+    # Cached answers are reused for many users, so they always come from the large model
+    model_router.ROUTER_ENABLED = False
+    versions = chatbot_apis.faq_versions()
+    done = {faq_cache.normalize_question(r["question"])
+            for r in faq_cache.read_records(args.out) if r.get("versions") == versions}
+    todo, seen = [], set(done)
+    for q in questions:
+        key = faq_cache.normalize_question(q)
+        if key not in seen:
+            seen.add(key)
+            todo.append(q)
+    print(f"{len(questions)} questions, {len(done)} already answered for this version, {len(todo)} to go")
+
+    qa = chatbot_apis.get_qa_chain()
+    pacer = Pacer(args.rpm)
+
+    def generate(question):
+        vector = chatbot_apis.embed_query(question)
+        pacer.wait()
+        scored_docs = chatbot_apis.retrieve_documents(question, vector=vector)
+        answer = qa.invoke({"query": question, "history": "", "scored_docs": scored_docs})
+        return {"question": question, "answer": answer, "embedding": faq_cache.encode_vector(vector),
+                "lang": detect_language(question), "versions": versions, "created": time.time()}
+
+    ok = failed = 0
+    with open(args.out, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {pool.submit(generate, q): q for q in todo}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Failed: {futures[future][:60]!r}: {e}")
+                continue
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            ok += 1
+            print(f"[{ok + failed}/{len(todo)}] {record['question'][:60]}")
+    print(f"Done: {ok} answered, {failed} failed; rerun to retry failures")
+
+
+if __name__ == "__main__":
+    main()
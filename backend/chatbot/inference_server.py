@@ -0,0 +1,35 @@
+"""
+Single-process mode: mounts the chat, video recommendation and scale routes on
+one Flask app. Models are shared through model_registry, so the XLM-R embedder,
+the emotion model and the Groq clients are loaded once instead of once per
+service. Background work (preloading) shares the model_registry pool of
+INFERENCE_WORKERS threads (default 8); the /api/chat/pipeline stages have
+their own pool of PIPELINE_WORKERS threads (default 32), so the process runs
+both and they are sized together. Each route keeps its own concurrency limit
+(LIMIT_CHAT, LIMIT_VIDEOS, ...) so a burst on one can't starve the others.
+
+Point both CHATBOT_API_HOST and VIDEO_RECOMMENDER_API_HOST at this server.
+INFERENCE_PRELOAD=1 loads every model at boot; /api/ready reports progress.
+"""
+import os
+from flask import Flask
+from flask_cors import CORS
+
+from chatbot_apis import chat_bp
+from video_recommender_api import video_bp
+from scale_detection_api import scale_bp
+from server_common import add_health_routes, add_memory_routes, add_metrics_routes, add_response_layer
+
+app = Flask(__name__)
+CORS(app)
+app.register_blueprint(chat_bp)
+app.register_blueprint(video_bp)
+app.register_blueprint(scale_bp)
+add_health_routes(app, "INFERENCE_PRELOAD")
+add_metrics_routes(app)
+add_memory_routes(app)
+add_response_layer(app)
+
+if __name__ == "__main__":
+    port = int(os.getenv("INFERENCE_PORT", os.getenv("PORT", 4001)))
+    app.run(host="0.0.0.0", port=port, threaded=True)
@@ -0,0 +1,36 @@
+from collections import Counter
+
+# Unicode blocks of the scripts our users write in. Script identifies the
+# language well enough for routing retrieval (Devanagari is treated as Hindi,
+# Arabic script as Urdu); romanised Hindi reads as English and uses that index.
+SCRIPT_RANGES = (
+    (0x0900, 0x097F, "hi"),   # Devanagari
+    (0x0980, 0x09FF, "bn"),   # Bengali
+    (0x0A00, 0x0A7F, "pa"),   # Gurmukhi
+    (0x0A80, 0x0AFF, "gu"),   # Gujarati
+    (0x0B00, 0x0B7F, "or"),   # Odia
+    (0x0B80, 0x0BFF, "ta"),   # Tamil
+    (0x0C00, 0x0C7F, "te"),   # Telugu
+    (0x0C80, 0x0CFF, "kn"),   # Kannada
+    (0x0D00, 0x0D7F, "ml"),   # Malayalam
+    (0x0600, 0x06FF, "ur"),   # Arabic
+)
+UNKNOWN = "und"
+
+
+def _script_language(ch):
+    code = ord(ch)
+    if code < 0x0250:
+        return "en" if ch.isalpha() else None
+    for start, end, lang in SCRIPT_RANGES:
+        if start <= code <= end:
+            return lang
+    return None
+
+
+def detect_language(text: str, sample: int = 400) -> str:
+    """Dominant script of the first `sample` characters as a language code, or "und"."""
+    counts = Counter(lang for lang in map(_script_language, text[:sample]) if lang)
+    if not counts:
+        return UNKNOWN
+    return counts.most_common(1)[0][0]
@@ -0,0 +1,443 @@
+import os
+import time
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Condition, Lock
+
+import metrics
+
+# Provider budgets per model (Groq enforces requests- and tokens-per-minute).
+# Off (0) by default: the limits depend on the account tier, so set them to
+# the ones shown for the key's organization. Without them 429s still shrink
+# the concurrency limit and are retried.
+GROQ_RPM = float(os.getenv("GROQ_RPM", 0))
+GROQ_TPM = float(os.getenv("GROQ_TPM", 0))
+# Upper bound for concurrent calls; the adaptive limit moves between 1 and this
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", 8))
+# Latency above this counts as a sign of provider saturation
+GROQ_TARGET_LATENCY = float(os.getenv("GROQ_TARGET_LATENCY", 5))
+# Total time one call may spend queued, waiting out 429s and retrying
+GROQ_DEADLINE = float(os.getenv("GROQ_DEADLINE", 20))
+# Completion size assumed before the response reports real usage
+EST_OUTPUT_TOKENS = int(os.getenv("GROQ_EST_OUTPUT_TOKENS", 300))
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+# Priority classes for the scheduler in front of each gateway, highest first.
+# Weights are the share of dispatches a class gets while all of them are
+# waiting; crisis also has slots no other class may take.
+PRIORITY_CLASSES = ("crisis", "chat", "background")
+PRIORITY_WEIGHTS = {
+    "crisis": float(os.getenv("PRIORITY_WEIGHT_CRISIS", 8)),
+    "chat": float(os.getenv("PRIORITY_WEIGHT_CHAT", 3)),
+    "background": float(os.getenv("PRIORITY_WEIGHT_BACKGROUND", 1)),
+}
+PRIORITY_RESERVED_CRISIS = int(os.getenv("PRIORITY_RESERVED_CRISIS", 1))
+# Tokens per reserved crisis call that other classes must leave in the TPM bucket
+PRIORITY_RESERVED_TOKENS = int(os.getenv("PRIORITY_RESERVED_TOKENS", 1500))
+# Queued calls at which a class is refused outright; crisis is never shed
+PRIORITY_SHED_DEPTH = {
+    "background": int(os.getenv("PRIORITY_SHED_BACKGROUND", 4)),
+    "chat": int(os.getenv("PRIORITY_SHED_CHAT", 64)),
+}
+
+
+class LLMUnavailable(RuntimeError):
+    """The call could not be completed within its deadline (rate limited or upstream down)."""
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Refills continuously at rate_per_minute, holding at most one minute's worth.
+    A rate of 0 or less means no budget: nothing waits and nothing is counted.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.unlimited = rate_per_minute <= 0
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.unlimited:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        if self.unlimited:
+            return 0.0
+        # A single request larger than the bucket only needs a full bucket
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        if not self.unlimited:
+            self.tokens -= min(amount, self.capacity)
+
+    def settle(self, estimated, actual):
+        # Refund an over-estimate, or go into debt for an under-estimate
+        if not self.unlimited:
+            self.tokens += min(estimated, self.capacity) - actual
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: halves on a 429, shrinks slightly when latency
+    exceeds the target and grows by ~1 per window of healthy calls. Other
+    classes leave `reserved` slots of the limit to crisis calls (never the
+    only one) and don't take a slot while a crisis call is waiting for one.
+    """
+
+    def __init__(self, max_limit, target_latency, reserved=PRIORITY_RESERVED_CRISIS):
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.reserved = reserved
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._crisis_waiting = 0
+        self._cond = Condition()
+
+    def _has_room(self, crisis):
+        if crisis:
+            return self.in_flight < int(self.limit)
+        return not self._crisis_waiting and self.in_flight < max(1, int(self.limit) - self.reserved)
+
+    def acquire(self, deadline, priority="chat"):
+        crisis = priority == "crisis"
+        with self._cond:
+            self._crisis_waiting += crisis
+            try:
+                while not self._has_room(crisis):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self.in_flight += 1
+                return True
+            finally:
+                self._crisis_waiting -= crisis
+                if crisis:
+                    self._cond.notify_all()
+
+    def release(self, outcome, latency):
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                self.limit = max(1.0, self.limit / 2)
+            elif outcome == "ok" and latency > self.target_latency:
+                self.limit = max(1.0, self.limit * 0.9)
+            elif outcome == "ok":
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class PriorityScheduler:
+    """
+    Start-time fair queuing over the priority classes: each waiting call gets a
+    virtual start tag advanced by 1/weight per call of its class, and free slots
+    go to the smallest eligible tag. Only crisis calls may use the last
+    `reserved` slots. Low classes are shed once the queue is deep.
+    """
+
+    def __init__(self, name, slots=GROQ_MAX_CONCURRENCY, reserved=PRIORITY_RESERVED_CRISIS):
+        self.name = name
+        self.slots = slots
+        self.reserved = min(reserved, slots - 1)
+        self.in_use = 0
+        self._cond = Condition()
+        self._waiting = []
+        self._seq = 0
+        self._vtime = 0.0
+        self._finish = {cls: 0.0 for cls in PRIORITY_CLASSES}
+        self.counts = {cls: {"granted": 0, "shed": 0, "timed_out": 0} for cls in PRIORITY_CLASSES}
+
+    def queued(self):
+        with self._cond:
+            return len(self._waiting)
+
+    def should_shed(self, cls):
+        depth = PRIORITY_SHED_DEPTH.get(cls)
+        return depth is not None and self.queued() >= depth
+
+    def _eligible(self, cls):
+        limit = self.slots if cls == "crisis" else self.slots - self.reserved
+        return self.in_use < limit
+
+    def _dispatch(self):
+        # Called with the lock held; grants free slots in tag order
+        granted = False
+        for waiter in sorted(self._waiting, key=lambda w: (w["tag"], w["seq"])):
+            if not self._eligible(waiter["cls"]):
+                continue
+            self._waiting.remove(waiter)
+            waiter["granted"] = True
+            # A waiter skipped for a reserved slot can be granted after a later tag; never move back
+            self._vtime = max(self._vtime, waiter["tag"])
+            self.in_use += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(self, cls, deadline):
+        queued_at = time.monotonic()
+        with self._cond:
+            if cls in PRIORITY_SHED_DEPTH and len(self._waiting) >= PRIORITY_SHED_DEPTH[cls]:
+                self.counts[cls]["shed"] += 1
+                if metrics.ENABLED:
+                    metrics.inc("llm_priority_shed_total", model=self.name, priority=cls)
+                raise LLMUnavailable(f"{self.name}: shedding {cls} work under load")
+
+            tag = max(self._vtime, self._finish[cls])
+            self._finish[cls] = tag + 1 / PRIORITY_WEIGHTS[cls]
+            self._seq += 1
+            waiter = {"cls": cls, "tag": tag, "seq": self._seq, "granted": False}
+            self._waiting.append(waiter)
+            self._dispatch()
+            while not waiter["granted"]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(waiter)
+                    self.counts[cls]["timed_out"] += 1
+                    raise LLMUnavailable(f"{self.name}: no {cls} slot before deadline")
+                self._cond.wait(remaining)
+            self.counts[cls]["granted"] += 1
+        if metrics.ENABLED:
+            metrics.observe("llm_priority_wait_seconds", time.monotonic() - queued_at,
+                            model=self.name, priority=cls)
+
+    def release(self):
+        with self._cond:
+            self.in_use -= 1
+            self._dispatch()
+
+    def stats(self):
+        with self._cond:
+            queued = {cls: sum(1 for w in self._waiting if w["cls"] == cls) for cls in PRIORITY_CLASSES}
+            return {"slots": self.slots, "reserved_crisis": self.reserved, "in_use": self.in_use,
+                    "queued": queued, "counts": {cls: dict(c) for cls, c in self.counts.items()}}
+
+
+# Priority of the LLM calls made in the current request; routes set it with priority_scope
+_priority = ContextVar("llm_priority", default="chat")
+
+
+@contextmanager
+def priority_scope(cls):
+    token = _priority.set(cls)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limited(error):
+    return _status_code(error) == 429
+
+
+def is_transient(error):
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+def retry_after_seconds(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _reported_tokens(result):
+    meta = getattr(result, "response_metadata", None) or {}
+    usage = meta.get("token_usage") or getattr(result, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+class LLMGateway:
+    """
+    Shared front door for every call to one provider model. Paces calls with
+    request and token buckets, adapts how many run at once from observed 429s
+    and latency, and retries throttled or transient failures with jittered
+    backoff until the deadline. The budget is priority-aware like the
+    scheduler: other classes leave headroom in both buckets for crisis calls
+    and wait while a crisis call is waiting for budget.
+    """
+
+    def __init__(self, name, rpm=GROQ_RPM, tpm=GROQ_TPM, max_concurrency=GROQ_MAX_CONCURRENCY,
+                 target_latency=GROQ_TARGET_LATENCY, deadline=GROQ_DEADLINE):
+        self.name = name
+        self.deadline = deadline
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.limiter = AdaptiveLimiter(max_concurrency, target_latency)
+        self.scheduler = PriorityScheduler(name, max_concurrency)
+        self._lock = Lock()
+        self._blocked_until = 0.0
+        self._crisis_waiting = 0
+        self.counts = {"ok": 0, "throttled": 0, "error": 0, "retries": 0, "gave_up": 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+        if metrics.ENABLED:
+            metrics.inc("llm_gateway_calls_total", model=self.name, outcome=outcome)
+
+    def _budget_wait(self, tokens, crisis):
+        # Called with the lock held; seconds until this call may spend its budget
+        now = time.monotonic()
+        self.rpm.refill(now)
+        self.tpm.refill(now)
+        reserve = 0 if crisis else PRIORITY_RESERVED_CRISIS
+        wait = max(self._blocked_until - now,
+                   self.rpm.wait_time(1 + reserve),
+                   self.tpm.wait_time(tokens + reserve * PRIORITY_RESERVED_TOKENS))
+        if not crisis and self._crisis_waiting:
+            wait = max(wait, 0.05)
+        return wait
+
+    def _acquire_budget(self, tokens, deadline, priority="chat"):
+        crisis = priority == "crisis"
+        with self._lock:
+            self._crisis_waiting += crisis
+        try:
+            while True:
+                with self._lock:
+                    wait = self._budget_wait(tokens, crisis)
+                    if wait <= 0:
+                        self.rpm.take(1)
+                        self.tpm.take(tokens)
+                        return
+                if time.monotonic() + wait > deadline:
+                    self._count("gave_up")
+                    raise LLMUnavailable(f"{self.name}: rate budget exhausted", retry_after=wait)
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self._crisis_waiting -= crisis
+
+    def _settle_tokens(self, estimated, result):
+        actual = _reported_tokens(result)
+        if actual is None:
+            return
+        with self._lock:
+            self.tpm.settle(estimated, actual)
+
+    def call(self, fn, est_tokens, deadline=None, priority=None):
+        deadline = time.monotonic() + (self.deadline if deadline is None else deadline)
+        priority = priority or current_priority()
+        # The scheduler decides the order calls reach the rate budget and limiter
+        self.scheduler.acquire(priority, deadline)
+        try:
+            return self._call(fn, est_tokens, deadline, priority)
+        finally:
+            self.scheduler.release()
+
+    def _call(self, fn, est_tokens, deadline, priority="chat"):
+        queued_at = time.monotonic()
+        attempt = 0
+        while True:
+            self._acquire_budget(est_tokens, deadline, priority)
+            if not self.limiter.acquire(deadline, priority):
+                self._count("gave_up")
+                raise LLMUnavailable(f"{self.name}: no free slot before deadline")
+            if metrics.ENABLED and attempt == 0:
+                metrics.observe("llm_gateway_queue_seconds", time.monotonic() - queued_at, model=self.name)
+
+            start = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = is_rate_limited(e)
+                self.limiter.release("throttled" if throttled else "error", time.monotonic() - start)
+                self._count("throttled" if throttled else "error")
+                if not (throttled or is_transient(e)):
+                    raise
+
+                # Full jitter keeps throttled callers from retrying in lockstep
+                delay = retry_after_seconds(e) or random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+                if throttled:
+                    with self._lock:
+                        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+                if time.monotonic() + delay > deadline:
+                    self._count("gave_up")
+                    raise LLMUnavailable(f"{self.name}: gave up after {attempt + 1} attempts: {e}",
+                                         retry_after=delay) from e
+                self._count("retries")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.limiter.release("ok", time.monotonic() - start)
+            self._count("ok")
+            self._settle_tokens(est_tokens, result)
+            return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts, limit=round(self.limiter.limit, 2), in_flight=self.limiter.in_flight,
+                         rpm_tokens=None if self.rpm.unlimited else round(self.rpm.tokens, 2),
+                         tpm_tokens=None if self.tpm.unlimited else round(self.tpm.tokens, 1))
+        stats["scheduler"] = self.scheduler.stats()
+        return stats
+
+
+class GatewayLLM:
+    """Wraps a chat model so every invoke() goes through its model's gateway."""
+
+    def __init__(self, llm, gateway, output_tokens=EST_OUTPUT_TOKENS):
+        self.llm = llm
+        self.gateway = gateway
+        self.output_tokens = output_tokens
+
+    def invoke(self, input, config=None, **kwargs):
+        text = input.to_string() if hasattr(input, "to_string") else str(input)
+        # ~4 characters per token is close enough for budgeting
+        est_tokens = len(text) // 4 + self.output_tokens
+        return self.gateway.call(lambda: self.llm.invoke(input, config, **kwargs), est_tokens)
+
+
+_gateways_lock = Lock()
+_gateways = {}
+
+
+def get_gateway(model_name):
+    """One gateway per model: Groq's limits are tracked per model."""
+    with _gateways_lock:
+        if model_name not in _gateways:
+            _gateways[model_name] = LLMGateway(model_name)
+        return _gateways[model_name]
+
+
+def should_shed(cls):
+    """True when any model's queue is deep enough that work of this class is being refused."""
+    with _gateways_lock:
+        gateways = list(_gateways.values())
+    return any(gw.scheduler.should_shed(cls) for gw in gateways)
+
+
+def gateway_stats():
+    with _gateways_lock:
+        gateways = dict(_gateways)
+    return {name: gw.stats() for name, gw in gateways.items()}
@@ -0,0 +1,258 @@
+"""
+Opt-in memory diagnostics (MEMORY_PROFILE=1).
+
+- Load-time attribution: model_registry loads run one at a time and record the
+  resident size each component added, excluding components it loaded itself
+  (the vectorstore's cost doesn't include the embedder it pulls in).
+- Per-endpoint accounting: resident growth per request, and with
+  MEMORY_TRACEMALLOC=1 a tracemalloc diff of the top allocation sites for
+  every MEMORY_SNAPSHOT_EVERY-th request of each endpoint.
+- GET /api/admin/memory (see server_common.add_memory_routes) reports both.
+
+Resident size is process-wide, so per-request numbers are only clean when the
+endpoint is not running concurrently with others; the load-time numbers are
+exact because loads are serialized while profiling. That serialization is a
+single process-wide RLock around every model_registry load, so with
+MEMORY_PROFILE=1 a preload or a first request waits for any other component
+that is loading: expect slower boots, and don't leave it on in production.
+
+CLI: loads each component in a fresh interpreter and prints what it costs.
+    python memory_profile.py [embedder vectorstore emotion_classifier ...]
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from threading import Lock, RLock, local
+
+ENABLED = os.getenv("MEMORY_PROFILE", "0") == "1"
+TRACEMALLOC = ENABLED and os.getenv("MEMORY_TRACEMALLOC", "0") == "1"
+TRACE_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", 5))
+SNAPSHOT_EVERY = int(os.getenv("MEMORY_SNAPSHOT_EVERY", 50))
+TOP_ALLOCATIONS = int(os.getenv("MEMORY_TOP_ALLOCATIONS", 15))
+
+if TRACEMALLOC and not tracemalloc.is_tracing():
+    tracemalloc.start(TRACE_FRAMES)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Held while a component loads, so concurrent preloads don't blur each other's deltas
+_load_lock = RLock()
+_active = local()
+_components = {}
+
+_stats_lock = Lock()
+_endpoints = {}
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # No /proc (macOS): fall back to the peak, which is the best we have
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def load_lock():
+    return _load_lock if ENABLED else nullcontext()
+
+
+@contextmanager
+def measure_load(name):
+    """Records the resident growth of loading `name`, minus nested component loads."""
+    if not ENABLED:
+        yield
+        return
+    stack = getattr(_active, "stack", None)
+    if stack is None:
+        stack = _active.stack = []
+    frame = {"nested": 0, "nested_heap": 0}
+    stack.append(frame)
+    before = rss_bytes()
+    heap_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    try:
+        yield
+    finally:
+        stack.pop()
+        inclusive = rss_bytes() - before
+        heap = tracemalloc.get_traced_memory()[0] - heap_before if heap_before is not None else 0
+        if stack:
+            stack[-1]["nested"] += inclusive
+            stack[-1]["nested_heap"] += heap
+    entry = {"rss_bytes": inclusive - frame["nested"], "rss_inclusive_bytes": inclusive}
+    if heap_before is not None:
+        entry["python_heap_bytes"] = heap - frame["nested_heap"]
+    _components[name] = entry
+
+
+def breakdown(value):
+    """Estimated split of a FAISS vectorstore into the vector index and the docstore."""
+    index, docstore = getattr(value, "index", None), getattr(value, "docstore", None)
+    if index is None or docstore is None or not hasattr(index, "ntotal"):
+        return None
+    code_size = getattr(index, "code_size", index.d * 4)
+    docs = getattr(docstore, "_dict", {})
+    docstore_bytes = sum(sys.getsizeof(doc.page_content) + sum(sys.getsizeof(v) for v in doc.metadata.values())
+                         for doc in docs.values())
+    return {"vectors": int(index.ntotal), "faiss_index_bytes": int(index.ntotal * code_size),
+            "docstore_documents": len(docs), "docstore_bytes_estimate": docstore_bytes}
+
+
+def component_report():
+    """Load-time attribution for every component loaded while profiling was on."""
+    import model_registry
+
+    report = {}
+    for name, entry in _components.items():
+        row = dict(entry)
+        resource = model_registry._resources.get(name)
+        if resource is not None and resource.loaded:
+            split = breakdown(resource.get())
+            if split:
+                row.update(split)
+        report[name] = row
+    return report
+
+
+def _snapshot():
+    # Leave out tracemalloc's own bookkeeping
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def begin_request(endpoint):
+    """Per-request state for end_request(); None when profiling is off."""
+    if not ENABLED:
+        return None
+    with _stats_lock:
+        row = _endpoints.setdefault(endpoint, {"requests": 0, "rss_growth_bytes": 0, "max_rss_growth_bytes": 0,
+                                               "snapshots": 0, "top_allocations": []})
+        row["requests"] += 1
+        sample = TRACEMALLOC and row["requests"] % SNAPSHOT_EVERY == 1 % SNAPSHOT_EVERY
+    # Snapshots walk every traced block, so only a sample of requests pays for one
+    return {"rss": rss_bytes(), "snapshot": _snapshot() if sample else None}
+
+
+def end_request(state, endpoint):
+    if state is None:
+        return
+    growth = rss_bytes() - state["rss"]
+    top = None
+    if state["snapshot"] is not None:
+        diff = _snapshot().compare_to(state["snapshot"], "lineno")
+        top = [{"where": str(stat.traceback), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+               for stat in diff[:TOP_ALLOCATIONS]]
+    with _stats_lock:
+        row = _endpoints[endpoint]
+        row["rss_growth_bytes"] += max(growth, 0)
+        row["max_rss_growth_bytes"] = max(row["max_rss_growth_bytes"], growth)
+        if top is not None:
+            row["snapshots"] += 1
+            row["top_allocations"] = top
+
+
+def top_allocations(limit=TOP_ALLOCATIONS, group_by="lineno"):
+    """Largest live allocation sites right now (tracemalloc must be on)."""
+    if not tracemalloc.is_tracing():
+        return None
+    stats = _snapshot().statistics(group_by)
+    return [{"where": str(stat.traceback), "size_bytes": stat.size, "count": stat.count} for stat in stats[:limit]]
+
+
+def report(limit=TOP_ALLOCATIONS):
+    with _stats_lock:
+        endpoints = {name: dict(row) for name, row in _endpoints.items()}
+    traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+    return {
+        "enabled": ENABLED,
+        "rss_bytes": rss_bytes(),
+        "components": component_report(),
+        "endpoints": endpoints,
+        "tracemalloc": None if traced is None else {"current_bytes": traced[0], "peak_bytes": traced[1],
+                                                    "top_allocations": top_allocations(limit)},
+    }
+
+
+# CLI -------------------------------------------------------------------------
+
+# Modules that register the components in model_registry
+COMPONENT_MODULES = ("chatbot_apis", "video_recommender")
+DEFAULT_COMPONENTS = ("embedder", "vectorstore", "emotion_classifier", "faq_index", "qa_chain", "relevance_chain")
+
+
+def _profile_child(name):
+    import importlib
+
+    start_rss = rss_bytes()
+    for module in COMPONENT_MODULES:
+        importlib.import_module(module)
+    import model_registry
+
+    imports_rss = rss_bytes()
+    start = time.perf_counter()
+    model_registry.get(name)
+    result = {
+        "component": name,
+        "interpreter_rss_bytes": start_rss,
+        "imports_rss_bytes": imports_rss - start_rss,
+        "load_seconds": round(time.perf_counter() - start, 2),
+        "total_rss_bytes": rss_bytes(),
+        "loaded": component_report(),
+    }
+    print(json.dumps(result))
+
+
+def _mb(n):
+    return f"{n / 2 ** 20:8.1f} MB"
+
+
+def main():
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("components", nargs="*", default=list(DEFAULT_COMPONENTS))
+    parser.add_argument("--json", action="store_true", help="print raw results")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Run as a script this file is __main__; model_registry records into the imported module
+        import memory_profile
+        memory_profile._profile_child(args.child)
+        return
+
+    env = dict(os.environ, MEMORY_PROFILE="1", MEMORY_TRACEMALLOC="0")
+    results = []
+    for name in args.components:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name],
+                              env=env, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{name}: failed to load\n{proc.stderr.strip()[-2000:]}")
+            continue
+        results.append(json.loads(lines[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for r in results:
+        own = r["loaded"].get(r["component"], {})
+        print(f"{r['component']:<22} {_mb(own.get('rss_bytes', 0))}   (load {r['load_seconds']}s, "
+              f"process total {_mb(r['total_rss_bytes']).strip()}, imports {_mb(r['imports_rss_bytes']).strip()})")
+        for dep, entry in r["loaded"].items():
+            if dep != r["component"]:
+                print(f"  + {dep:<18} {_mb(entry['rss_bytes'])}")
+        if "faiss_index_bytes" in own:
+            print(f"    faiss index        {_mb(own['faiss_index_bytes'])}   ({own['vectors']} vectors)")
+            print(f"    docstore (est.)    {_mb(own['docstore_bytes_estimate'])}   "
+                  f"({own['docstore_documents']} documents)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+
+# METRICS_ENABLED=0 turns every hook into a flag check
+ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Seconds; spans a FAISS lookup (~ms) up to a slow Groq completion
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+_lock = Lock()
+_histograms = {}
+_counters = {}
+
+# Per-request stage timings for the Server-Timing debug header. Holds a dict
+# only while a request asked for it; LangChain copies the context into its
+# worker threads, so parallel chain branches record into the same dict.
+_request_timings = ContextVar("request_timings", default=None)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    hist = _histograms.get(key)
+    if hist is None:
+        with _lock:
+            hist = _histograms.setdefault(key, Histogram())
+    hist.observe(seconds)
+
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+@contextmanager
+def stage_timer(pipeline, stage):
+    """Times one pipeline stage into rag_stage_seconds{pipeline,stage}."""
+    timings = _request_timings.get()
+    if not ENABLED and timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if ENABLED:
+            inc("rag_stage_errors_total", pipeline=pipeline, stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if ENABLED:
+            observe("rag_stage_seconds", elapsed, pipeline=pipeline, stage=stage)
+        if timings is not None:
+            timings[f"{pipeline}.{stage}"] = timings.get(f"{pipeline}.{stage}", 0.0) + elapsed
+
+
+def timed(pipeline, stage, fn):
+    """Wraps fn so every call is recorded as one stage."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with stage_timer(pipeline, stage):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def start_request_timings(collect):
+    """Called at the start of every request; collect=False clears what a reused thread left behind."""
+    _request_timings.set({} if collect else None)
+
+
+def request_timings():
+    return _request_timings.get()
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def render_prometheus():
+    """Prometheus text exposition format (0.0.4) for everything recorded so far."""
+    lines = []
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+
+    seen = set()
+    for (name, labels), hist in histograms:
+        if name not in seen:
+            lines.append(f"# TYPE {name} histogram")
+            seen.add(name)
+        with hist._lock:
+            counts, total, count = list(hist.counts), hist.sum, hist.count
+        cumulative = 0
+        for bound, c in zip(hist.buckets, counts):
+            cumulative += c
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    for (name, labels), value in counters:
+        if name not in seen:
+            lines.append(f"# TYPE {name} counter")
+            seen.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
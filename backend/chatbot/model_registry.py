@@ -0,0 +1,120 @@
+import os
+import time
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import memory_profile
+
+
+class LazyResource:
+    """
+    Loads an expensive object (model, client) on first use.
+    Concurrent first callers wait on one load instead of each starting their own.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._lock = Lock()
+        self._value = None
+        self._loaded = False
+        self.load_seconds = None
+        self.error = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        # MEMORY_PROFILE=1 serializes loads (taken before self._lock, always in that order)
+        with memory_profile.load_lock(), self._lock:
+            if not self._loaded:
+                print(f"Loading {self.name}...")
+                start = time.perf_counter()
+                try:
+                    with memory_profile.measure_load(self.name):
+                        self._value = self._loader()
+                except Exception as e:
+                    # Leave unloaded so the next caller retries
+                    self.error = repr(e)
+                    raise
+                self.load_seconds = time.perf_counter() - start
+                self.error = None
+                self._loaded = True
+        return self._value
+
+    def set(self, value):
+        """Installs an already-built value (used by benchmarks to swap in local fakes)."""
+        with self._lock:
+            self._value = value
+            self._loaded = True
+            self.load_seconds = 0.0
+            self.error = None
+
+    def status(self):
+        return {"loaded": self._loaded, "load_seconds": self.load_seconds, "error": self.error}
+
+
+_registry_lock = Lock()
+_resources = {}
+_preloading = set()
+_executor = None
+
+# Worker pool shared by every service mounted in this process (preloading and
+# other background work), instead of each service spinning up its own. The
+# /api/chat/pipeline stages run on a separate pool, sized by PIPELINE_WORKERS
+# (chatbot_apis); size the two together: threads = INFERENCE_WORKERS + PIPELINE_WORKERS
+POOL_WORKERS = int(os.getenv("INFERENCE_WORKERS", 8))
+
+
+def register(name, loader):
+    """Registers a loader under `name`; registering the same name twice returns the first."""
+    with _registry_lock:
+        if name not in _resources:
+            _resources[name] = LazyResource(name, loader)
+        return _resources[name]
+
+
+def get(name):
+    return _resources[name].get()
+
+
+def override(name, value):
+    """Replaces whatever `name` would load with `value`, registering it if needed."""
+    register(name, lambda: value).set(value)
+
+
+def get_executor():
+    global _executor
+    with _registry_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="inference")
+        return _executor
+
+
+def _preload_one(name):
+    try:
+        _resources[name].get()
+    except Exception as e:
+        print(f"Preloading {name} failed: {e}")
+
+
+def preload(names=None, background=True):
+    """Loads the given resources (all registered ones by default) in parallel on the shared pool."""
+    names = list(_resources) if names is None else list(names)
+    _preloading.update(names)
+    futures = [get_executor().submit(_preload_one, name) for name in names]
+    if not background:
+        wait(futures)
+    return futures
+
+
+def is_ready():
+    """True once every resource queued by preload() has loaded."""
+    return all(_resources[name].loaded for name in _preloading)
+
+
+def status():
+    return {name: res.status() for name, res in _resources.items()}
@@ -0,0 +1,99 @@
+import os
+import logging
+from threading import Lock
+from typing import List, NamedTuple, Tuple
+
+import metrics
+from scale_detection import CRISIS_PATTERN, PHQ9_ITEMS, GAD7_ITEMS, compile_keywords
+
+LARGE_MODEL = os.getenv("GROQ_LARGE_MODEL", "llama-3.3-70b-versatile")
+SMALL_MODEL = os.getenv("GROQ_SMALL_MODEL", "llama-3.1-8b-instant")
+# ROUTER_ENABLED=0 sends everything to the large model, as before the cascade
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") == "1"
+
+# Escalation thresholds
+MAX_SMALL_WORDS = int(os.getenv("ROUTER_MAX_SMALL_WORDS", 40))
+MAX_SMALL_DISTRESS_TERMS = int(os.getenv("ROUTER_MAX_SMALL_DISTRESS_TERMS", 1))
+MAX_SMALL_HISTORY_CHARS = int(os.getenv("ROUTER_MAX_SMALL_HISTORY_CHARS", 4000))
+# Cosine similarity of the best retrieved chunk (chatbot_apis.search_store); a
+# close match means the answer should be grounded in medical facts, which the
+# large model does better. Tune it on real queries with benchmarks/cascade_eval.py.
+# Indexes built without normalized embeddings report no similarity and skip this.
+GROUNDED_RELEVANCE = float(os.getenv("ROUTER_GROUNDED_RELEVANCE", 0.5))
+
+DISTRESS_PATTERN = compile_keywords(
+    [kw for items in (PHQ9_ITEMS, GAD7_ITEMS) for no, kws in items.items() if no != 9 for kw in kws])
+
+
+class Route(NamedTuple):
+    tier: str
+    model: str
+    reasons: Tuple[str, ...]
+
+
+_lock = Lock()
+_stats = {}
+log = logging.getLogger(__name__)
+
+
+def route_chat(message: str, history: str = "", retrieval_scores: List[float] = ()) -> Route:
+    """Picks the model tier for a chat reply from cheap features of the request."""
+    if not ROUTER_ENABLED:
+        return Route("large", LARGE_MODEL, ("router_disabled",))
+
+    reasons = []
+    if CRISIS_PATTERN.search(message):
+        reasons.append("crisis_terms")
+    if len(message.split()) > MAX_SMALL_WORDS:
+        reasons.append("long_message")
+    if len(DISTRESS_PATTERN.findall(message)) > MAX_SMALL_DISTRESS_TERMS:
+        reasons.append("distress_terms")
+    if len(history) > MAX_SMALL_HISTORY_CHARS:
+        reasons.append("long_history")
+    scores = [s for s in retrieval_scores if s is not None]
+    if scores and max(scores) >= GROUNDED_RELEVANCE:
+        reasons.append("grounded_context")
+
+    if reasons:
+        return Route("large", LARGE_MODEL, tuple(reasons))
+    return Route("small", SMALL_MODEL, ("default",))
+
+
+def priority_class(message: str) -> str:
+    """Scheduler class for a user message: PHQ-9 item 9 terms put it ahead of everything else."""
+    return "crisis" if CRISIS_PATTERN.search(message) else "chat"
+
+
+def route_relevance() -> Route:
+    """The yes/no relevance check never needs the large model."""
+    if not ROUTER_ENABLED:
+        return Route("large", LARGE_MODEL, ("router_disabled",))
+    return Route("small", SMALL_MODEL, ("classification",))
+
+
+def record(pipeline: str, route: Route, seconds: float):
+    """
+    Counts a routing decision with the latency of the tier that served it
+    (route_stats, and llm_tier_seconds / llm_route_total with metrics on).
+    Escalations to the large model are printed; every decision is logged at
+    debug level.
+    """
+    line = f"Route {pipeline}: {route.tier} ({route.model}) in {seconds:.2f}s, reasons={','.join(route.reasons)}"
+    if route.tier == "large" and route.reasons != ("router_disabled",):
+        print(line)
+    else:
+        log.debug(line)
+    with _lock:
+        entry = _stats.setdefault(f"{pipeline}:{route.tier}", {"requests": 0, "seconds": 0.0})
+        entry["requests"] += 1
+        entry["seconds"] += seconds
+    if metrics.ENABLED:
+        metrics.observe("llm_tier_seconds", seconds, pipeline=pipeline, tier=route.tier)
+        for reason in route.reasons:
+            metrics.inc("llm_route_total", pipeline=pipeline, tier=route.tier, reason=reason)
+
+
+def route_stats():
+    with _lock:
+        return {key: dict(entry, mean_seconds=round(entry["seconds"] / entry["requests"], 4))
+                for key, entry in _stats.items()}
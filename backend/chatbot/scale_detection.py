@@ -1,7 +1,10 @@
 import json
 import re
+from functools import lru_cache
 from typing import List, Dict, Tuple
 
+from conversation_store import LOG_PATH, load_user_messages
+
 # Frequency and negation helpers
 FREQ_KEYWORDS = {
     3: [r"\bdaily\b", r"\bevery day\b", r"\balways\b", r"\bconstant\b", r"\bconstantly\b", r"\bnearly every day\b"],
@@ -31,6 +34,11 @@ def negated_nearby(pos: int, text: str, window=20) -> bool:
 def clamp(v, a, b):
     return max(a, min(b, v))
 
+def compile_keywords(keywords: List[str]) -> re.Pattern:
+    """One case-insensitive alternation for a keyword list, longest phrases first."""
+    alternatives = sorted({re.escape(k.lower()) for k in keywords}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", flags=re.I)
+
 # Scale keywords
 PHQ9_ITEMS = {
     1: ["little interest", "pleasure", "anhedonia", "not interested", "no interest", "bored", "lack of motivation", "disinterest", "uninspired"],
@@ -44,6 +52,9 @@ PHQ9_ITEMS = {
     9: ["suicidal", "suicide", "self-harm", "want to die", "kill myself", "thoughts of death", "ending life", "suicidal thoughts", "self-injury"]
 }
 
+# PHQ-9 item 9 (self-harm) terms; any hit marks a message as a possible crisis
+CRISIS_PATTERN = compile_keywords(PHQ9_ITEMS[9])
+
 GAD7_ITEMS = {
     1: ["feeling nervous", "nervous", "anxious", "anxiety", "on edge", "tense", "worried", "uneasy"],
     2: ["not being able to stop worrying", "worrying too much", "can't stop worrying", "excessive worry", "overthinking", "persistent worry", "ruminating"],
@@ -99,10 +110,12 @@ def score_item_from_text(item_keywords: List[str], text: str) -> Tuple[int, str]
 def aggregate_conversations(convos: List[str]) -> str:
     return "\n\n".join(convos)
 
-def estimate_phq9(text: str) -> Dict:
+def item_scores(items: Dict[int, List[str]], text: str) -> Dict[int, Tuple[int, str]]:
+    return {no: score_item_from_text(keys, text) for no, keys in items.items()}
+
+def phq9_result(scores: Dict[int, Tuple[int, str]]) -> Dict:
     total, per_item = 0, {}
-    for no, keys in PHQ9_ITEMS.items():
-        s, e = score_item_from_text(keys, text)
+    for no, (s, e) in scores.items():
         per_item[no] = {"score": s, "evidence": e}
         total += s
     if total <= 4: level = "Minimal"
@@ -112,10 +125,9 @@ def estimate_phq9(text: str) -> Dict:
     else: level = "Severe"
     return {"total": total, "level": level, "per_item": per_item}
 
-def estimate_gad7(text: str) -> Dict:
+def gad7_result(scores: Dict[int, Tuple[int, str]]) -> Dict:
     total, per_item = 0, {}
-    for no, keys in GAD7_ITEMS.items():
-        s, e = score_item_from_text(keys, text)
+    for no, (s, e) in scores.items():
         per_item[no] = {"score": s, "evidence": e}
         total += s
     if total <= 4: level = "Minimal"
@@ -124,10 +136,9 @@ def estimate_gad7(text: str) -> Dict:
     else: level = "Severe"
     return {"total": total, "level": level, "per_item": per_item}
 
-def estimate_ghq12(text: str, scoring="binary") -> Dict:
+def ghq12_result(scores: Dict[int, Tuple[int, str]], scoring="binary") -> Dict:
     total, per_item = 0, {}
-    for no, keys in GHQ12_ITEMS.items():
-        s, e = score_item_from_text(keys, text)
+    for no, (s, e) in scores.items():
         if scoring == "binary":
             b = 1 if s >= 1 else 0
             per_item[no] = {"score": b, "evidence": e}
@@ -143,13 +154,16 @@ def estimate_ghq12(text: str, scoring="binary") -> Dict:
         else: level = "High distress"
     return {"total": total, "level": level, "per_item": per_item}
 
-def estimate_scores(convos: List[str]) -> Dict:
-    text = aggregate_conversations(convos)
-    phq9 = estimate_phq9(text)
-    gad7 = estimate_gad7(text)
-    ghq_bin = estimate_ghq12(text, "binary")
-    ghq_lik = estimate_ghq12(text, "likert")
+def estimate_phq9(text: str) -> Dict:
+    return phq9_result(item_scores(PHQ9_ITEMS, text))
+
+def estimate_gad7(text: str) -> Dict:
+    return gad7_result(item_scores(GAD7_ITEMS, text))
+
+def estimate_ghq12(text: str, scoring="binary") -> Dict:
+    return ghq12_result(item_scores(GHQ12_ITEMS, text), scoring)
 
+def combine_scales(phq9: Dict, gad7: Dict, ghq_bin: Dict, ghq_lik: Dict) -> Dict:
     # Determine overall risk
     overall = "Low"
     if phq9["total"] >= 15 or gad7["total"] >= 15 or ghq_bin["total"] >= 6:
@@ -170,20 +184,47 @@ def estimate_scores(convos: List[str]) -> Dict:
         "flags": flags
     }
 
-# Load conversation JSON
-def load_conversation_json(path="conversation.json") -> List[str]:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return [m["content"] for m in data if isinstance(m, dict) and m.get("role") == "user"]
-    except FileNotFoundError:
-        return []
+def estimate_scores(convos: List[str]) -> Dict:
+    text = aggregate_conversations(convos)
+    phq9 = estimate_phq9(text)
+    gad7 = estimate_gad7(text)
+    ghq_bin = estimate_ghq12(text, "binary")
+    ghq_lik = estimate_ghq12(text, "likert")
+    return combine_scales(phq9, gad7, ghq_bin, ghq_lik)
+
+# Incremental scoring: each message is scored once and cached, so re-estimating a
+# growing conversation only scans the newest turn. An item's score is the best
+# across messages, which matches estimate_scores except that the 60-character
+# evidence window no longer reaches across message boundaries.
+@lru_cache(maxsize=4096)
+def score_message(text: str) -> Tuple[Dict, Dict, Dict]:
+    return item_scores(PHQ9_ITEMS, text), item_scores(GAD7_ITEMS, text), item_scores(GHQ12_ITEMS, text)
+
+def _best_per_item(per_message: List[Dict[int, Tuple[int, str]]], items: Dict) -> Dict[int, Tuple[int, str]]:
+    best = {no: (0, "") for no in items}
+    for scores in per_message:
+        for no, (s, e) in scores.items():
+            if s > best[no][0]:
+                best[no] = (s, e)
+    return best
+
+def estimate_scores_incremental(convos: List[str]) -> Dict:
+    scored = [score_message(text) for text in convos]
+    phq9 = _best_per_item([m[0] for m in scored], PHQ9_ITEMS)
+    gad7 = _best_per_item([m[1] for m in scored], GAD7_ITEMS)
+    ghq12 = _best_per_item([m[2] for m in scored], GHQ12_ITEMS)
+    return combine_scales(phq9_result(phq9), gad7_result(gad7),
+                          ghq12_result(ghq12, "binary"), ghq12_result(ghq12, "likert"))
+
+# Load the user side of the conversation log (a legacy conversation.json path also works)
+def load_conversation_json(path=LOG_PATH) -> List[str]:
+    return load_user_messages(path)
 
 # Example usage
 if __name__ == "__main__":
     user_msgs = load_conversation_json()
     if not user_msgs:
-        print("No conversation.json found or empty file.")
+        print("No conversation log found or empty file.")
     else:
         scores = estimate_scores(user_msgs)
         print(json.dumps(scores, indent=2, ensure_ascii=False))
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+from flask import Flask, Blueprint, request, jsonify
+from flask_cors import CORS
+from scale_detection import estimate_scores
+from server_common import add_health_routes, add_memory_routes, add_metrics_routes, add_response_layer, limit_concurrency
+
+scale_bp = Blueprint("scales", __name__)
+
+@scale_bp.route('/api/scales/estimate', methods=['POST'])
+@limit_concurrency("scales", 8)
+def estimate():
+    """
+    Accepts JSON: { "messages": ["<user text>", ...] }
+               or { "conversation": [{ "role": "user", "content": "..." }, ...] }
+    Returns the PHQ-9 / GAD-7 / GHQ-12 breakdown from scale_detection.estimate_scores.
+    """
+    payload = request.get_json(silent=True) or {}
+    messages = payload.get("messages")
+    if messages is None:
+        messages = [m.get("content", "") for m in payload.get("conversation") or []
+                    if isinstance(m, dict) and m.get("role") == "user"]
+    messages = [m for m in messages if isinstance(m, str) and m.strip()]
+
+    if not messages:
+        return jsonify({"error": "messages required"}), 400
+
+    return jsonify(estimate_scores(messages))
+
+def create_app():
+    """The standalone scales service; inference_server mounts scale_bp instead."""
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(scale_bp)
+    add_health_routes(app, "SCALES_PRELOAD")
+    add_metrics_routes(app)
+    add_memory_routes(app)
+    add_response_layer(app)
+    return app
+
+if __name__ == "__main__":
+    port = int(os.getenv("SCALES_PORT", 4003))
+    create_app().run(host="0.0.0.0", port=port)
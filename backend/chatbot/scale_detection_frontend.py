@@ -3,6 +3,8 @@ import re
 from typing import List, Dict, Tuple
 import streamlit as st
 
+from conversation_store import LOG_PATH, load_user_messages
+
 # Frequency and negation helpers
 FREQ_KEYWORDS = {
     3: [r"\bdaily\b", r"\bevery day\b", r"\balways\b", r"\bconstant\b", r"\bconstantly\b", r"\bnearly every day\b"],
@@ -171,13 +173,8 @@ def estimate_scores(convos: List[str]) -> Dict:
         "flags": flags
     }
 
-def load_conversation_json(path="conversation.json") -> List[str]:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return [m["content"] for m in data if isinstance(m, dict) and m.get("role") == "user"]
-    except FileNotFoundError:
-        return []
+def load_conversation_json(path=LOG_PATH) -> List[str]:
+    return load_user_messages(path)
 
 # Streamlit UI
 def main():
@@ -186,7 +183,7 @@ def main():
 
     user_msgs = load_conversation_json()
     if not user_msgs:
-        st.warning("No conversation.json found. Please chat first.")
+        st.warning("No conversation found. Please chat first.")
         return
 
     if len(user_msgs) < 3:
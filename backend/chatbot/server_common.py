@@ -0,0 +1,234 @@
+import os
+import gzip
+import hmac
+import time
+from functools import wraps
+from threading import BoundedSemaphore, Lock
+from flask import Response, g, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; jsonify falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+import memory_profile
+import metrics
+import model_registry
+
+# METRICS_DEBUG_HEADER=1 lets callers send X-Debug-Timings: 1 and get per-stage
+# timings back in a Server-Timing response header
+DEBUG_TIMINGS = os.getenv("METRICS_DEBUG_HEADER", "0") == "1"
+
+# Required in X-Admin-Token for /api/admin/* routes, which are not mounted
+# without it (behind a proxy every caller looks like loopback)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Response layer (add_response_layer): orjson for jsonify when installed, and
+# br/gzip for bodies of at least COMPRESS_MIN_BYTES when the caller accepts it
+FAST_JSON = os.getenv("FAST_JSON", "1") == "1"
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 5))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+
+# How long a request may wait for a free slot before it is turned away
+QUEUE_TIMEOUT = float(os.getenv("ROUTE_QUEUE_TIMEOUT", 5))
+
+_limits = {}
+_limits_lock = Lock()
+
+
+def limit_concurrency(name, default_limit, exempt=None):
+    """
+    Caps how many requests of one route run at once (LIMIT_<NAME> overrides the
+    default). Requests that can't get a slot within ROUTE_QUEUE_TIMEOUT get a 503,
+    so a burst on one route can't take every worker thread from the others.
+    Requests for which exempt() is true skip the cap (crisis messages).
+    """
+    limit = int(os.getenv(f"LIMIT_{name.upper()}", default_limit))
+    semaphore = BoundedSemaphore(limit)
+    state = _limits[name] = {"limit": limit, "in_use": 0}
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if exempt is not None and exempt():
+                return view(*args, **kwargs)
+            if not semaphore.acquire(timeout=QUEUE_TIMEOUT):
+                resp = jsonify({"error": f"{name} is busy, retry shortly"})
+                resp.headers["Retry-After"] = "1"
+                return resp, 503
+            with _limits_lock:
+                state["in_use"] += 1
+            try:
+                return view(*args, **kwargs)
+            finally:
+                with _limits_lock:
+                    state["in_use"] -= 1
+                semaphore.release()
+        return wrapper
+    return decorator
+
+
+def limits_status():
+    with _limits_lock:
+        return {name: dict(state) for name, state in _limits.items()}
+
+
+def add_health_routes(app, preload_env):
+    """
+    Adds GET /api/ready to a standalone or unified app. When the env var
+    `preload_env` is "1" all registered models start loading at boot and
+    /api/ready answers 503 until they are in memory.
+    """
+    if os.getenv(preload_env, "0") == "1":
+        model_registry.preload()
+
+    @app.route("/api/ready", methods=["GET"])
+    def ready():
+        is_ready = model_registry.is_ready()
+        return jsonify({
+            "ready": is_ready,
+            "models": model_registry.status(),
+            "limits": limits_status(),
+        }), (200 if is_ready else 503)
+
+
+def add_metrics_routes(app):
+    """Adds GET /metrics (Prometheus text format) and per-request latency hooks."""
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+        metrics.start_request_timings(DEBUG_TIMINGS and request.headers.get("X-Debug-Timings") == "1")
+
+    @app.after_request
+    def _record_request(response):
+        if metrics.ENABLED and request.endpoint != "metrics_endpoint":
+            metrics.observe("http_request_seconds", time.perf_counter() - g.request_start,
+                            endpoint=request.endpoint or "unknown", status=response.status_code)
+        timings = metrics.request_timings()
+        if timings:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+def is_admin_request():
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def add_memory_routes(app):
+    """
+    With MEMORY_PROFILE=1, tracks per-endpoint memory growth and, when
+    ADMIN_TOKEN is set, adds GET /api/admin/memory?top=N (component sizes,
+    endpoint growth and, with MEMORY_TRACEMALLOC=1, top allocation sites).
+    Does nothing otherwise.
+    """
+    if not memory_profile.ENABLED:
+        return
+
+    @app.before_request
+    def _start_memory():
+        if request.endpoint != "admin_memory":
+            g.memory_state = memory_profile.begin_request(request.endpoint or "unknown")
+
+    @app.after_request
+    def _record_memory(response):
+        state = g.pop("memory_state", None)
+        if state is not None:
+            memory_profile.end_request(state, request.endpoint or "unknown")
+        return response
+
+    if not ADMIN_TOKEN:
+        print("MEMORY_PROFILE is on but ADMIN_TOKEN is unset: /api/admin/memory is disabled")
+        return
+
+    @app.route("/api/admin/memory", methods=["GET"])
+    def admin_memory():
+        if not is_admin_request():
+            return jsonify({"error": "forbidden"}), 403
+        return jsonify(memory_profile.report(request.args.get("top", memory_profile.TOP_ALLOCATIONS, type=int)))
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    jsonify() and request.get_json() through orjson. Output is UTF-8 rather
+    than \\u-escaped, which also keeps Hindi/Bengali replies about half the
+    size; values orjson can't encode go through Flask's default hook.
+    """
+
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=self.OPTIONS),
+                                        mimetype=self.mimetype)
+
+
+def _compressible(response):
+    mimetype = response.mimetype or ""
+    return (200 <= response.status_code < 300 and response.status_code != 204
+            and not response.is_streamed and not response.direct_passthrough
+            and "Content-Encoding" not in response.headers
+            and (mimetype == "application/json" or mimetype.startswith("text/")))
+
+
+def compress_body(body, accept_encodings):
+    """(encoding, compressed body) for the best encoding the caller accepts, or (None, body)."""
+    if brotli is not None and accept_encodings.quality("br") > 0:
+        return "br", brotli.compress(body, quality=BROTLI_QUALITY)
+    if accept_encodings.quality("gzip") > 0:
+        return "gzip", gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return None, body
+
+
+def add_response_layer(app):
+    """
+    Fast JSON for jsonify(), weak ETags with 304s on GET responses (a caller
+    that sends If-None-Match skips the body when it hasn't changed), and br/gzip
+    for bodies of at least COMPRESS_MIN_BYTES. Node's fetch sends
+    Accept-Encoding and decompresses transparently.
+    """
+    if FAST_JSON and orjson is not None:
+        app.json = OrjsonProvider(app)
+
+    @app.after_request
+    def _finish_response(response):
+        if (request.method in ("GET", "HEAD") and response.status_code == 200 and not response.is_streamed
+                and not response.direct_passthrough):
+            # The tag covers the identity body, so it's weak: equal across encodings
+            if "ETag" not in response.headers:
+                response.add_etag(weak=True)
+            response.make_conditional(request)
+        if not _compressible(response):
+            return response
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+        encoding, compressed = compress_body(body, request.accept_encodings)
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        if metrics.ENABLED:
+            metrics.inc("http_response_bytes_total", len(body), encoding="identity")
+            metrics.inc("http_response_bytes_total", len(compressed), encoding=encoding)
+        return response
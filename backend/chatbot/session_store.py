@@ -0,0 +1,151 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+
+import metrics
+
+# Bounded in-memory default; a shared backend (Redis etc.) can be plugged in with set_backend
+SESSION_MAX = int(os.getenv("SESSION_MAX", 10000))
+SESSION_TTL = float(os.getenv("SESSION_TTL", 3600))
+# Oldest turns are dropped beyond this, like the client-side window they replace
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", 40))
+
+
+class SessionExpired(KeyError):
+    """The session id is unknown or timed out; the client must resend its history."""
+
+
+class Session:
+    """
+    One conversation kept server-side: the raw messages, their formatted
+    history lines (so the prompt history is never rebuilt from scratch) and a
+    free-form dict for derived state.
+    """
+
+    def __init__(self, session_id, messages=(), lines=(), state=None):
+        self.id = session_id
+        self.messages = list(messages)
+        self.lines = list(lines)
+        self.state = dict(state or {})
+
+    @property
+    def history(self):
+        return "".join(self.lines)
+
+    def extend(self, messages, lines):
+        self.messages.extend(messages)
+        self.lines.extend(lines)
+        overflow = len(self.messages) - SESSION_MAX_MESSAGES
+        if overflow > 0:
+            del self.messages[:overflow]
+            del self.lines[:overflow]
+
+    def to_dict(self):
+        return {"id": self.id, "messages": list(self.messages), "lines": list(self.lines), "state": dict(self.state)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["messages"], data["lines"], data.get("state"))
+
+
+class MemorySessionBackend:
+    """LRU-bounded dict whose entries expire SESSION_TTL seconds after last use."""
+
+    def __init__(self, max_sessions=SESSION_MAX, ttl=SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = Lock()
+        self._items = OrderedDict()
+        self.evicted = 0
+        self.expired = 0
+
+    def get(self, session_id):
+        with self._lock:
+            item = self._items.get(session_id)
+            if item is None:
+                return None
+            if time.monotonic() - item[0] > self.ttl:
+                del self._items[session_id]
+                self.expired += 1
+                return None
+            # Reading counts as use, so an active conversation doesn't time out
+            self._items[session_id] = (time.monotonic(), item[1])
+            self._items.move_to_end(session_id)
+            return Session.from_dict(item[1])
+
+    def _store(self, session):
+        # Called with the lock held
+        self._items[session.id] = (time.monotonic(), session.to_dict())
+        self._items.move_to_end(session.id)
+        while len(self._items) > self.max_sessions:
+            self._items.popitem(last=False)
+            self.evicted += 1
+
+    def put(self, session):
+        with self._lock:
+            self._store(session)
+
+    def append(self, session, messages, lines):
+        with self._lock:
+            item = self._items.get(session.id)
+            if item is not None and time.monotonic() - item[0] <= self.ttl:
+                session = Session.from_dict(item[1])
+            session.extend(messages, lines)
+            self._store(session)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._items.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._items), "max_sessions": self.max_sessions, "ttl": self.ttl,
+                    "evicted": self.evicted, "expired": self.expired}
+
+
+_backend = MemorySessionBackend()
+
+
+def set_backend(backend):
+    """
+    Any object with get(id) -> Session|None, put(session),
+    append(session, messages, lines) and delete(id).
+    """
+    global _backend
+    _backend = backend
+
+
+def new_session():
+    return Session(uuid.uuid4().hex)
+
+
+def load(session_id):
+    session = _backend.get(session_id)
+    if metrics.ENABLED:
+        metrics.inc("chat_sessions_total", outcome="hit" if session else "miss")
+    if session is None:
+        raise SessionExpired(session_id)
+    return session
+
+
+def save(session):
+    _backend.put(session)
+
+
+def append(session, messages, lines):
+    """
+    Adds messages to the stored copy of the session (or stores `session` when
+    there is none yet) in one step, so two turns in flight on the same session
+    both end up in it instead of the later save overwriting the earlier one.
+    """
+    _backend.append(session, messages, lines)
+
+
+def delete(session_id):
+    _backend.delete(session_id)
+
+
+def stats():
+    return _backend.stats() if hasattr(_backend, "stats") else {}
@@ -0,0 +1,99 @@
+import time
+import threading
+
+import pytest
+
+from coalesce import SingleFlight, request_key
+
+
+class Interrupted(BaseException):
+    """Stands in for KeyboardInterrupt/SystemExit without stopping the test run."""
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def run_coalesced(flight, fn, followers=3):
+    """Runs one leader and `followers` callers on the same key; returns each caller's outcome."""
+    release = threading.Event()
+    calls = []
+
+    def leader_fn():
+        calls.append(1)
+        release.wait(5)
+        return fn()
+
+    outcomes = []
+    lock = threading.Lock()
+
+    def caller():
+        try:
+            result = ("result", flight.do("k", leader_fn))
+        except BaseException as e:
+            result = ("error", e)
+        with lock:
+            outcomes.append(result)
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    wait_for(lambda: calls)
+    threads = [threading.Thread(target=caller) for _ in range(followers)]
+    for t in threads:
+        t.start()
+    wait_for(lambda: flight.coalesced == followers)
+    release.set()
+    for t in [leader] + threads:
+        t.join(5)
+    return outcomes, len(calls)
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight("test")
+    outcomes, calls = run_coalesced(flight, lambda: "answer")
+    assert calls == 1
+    assert outcomes == [("result", "answer")] * 4
+    assert flight.stats()["leaders"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight("test")
+    error = ValueError("upstream down")
+
+    def fail():
+        raise error
+
+    outcomes, calls = run_coalesced(flight, fail)
+    assert calls == 1
+    assert outcomes == [("error", error)] * 4
+
+
+def test_followers_get_a_base_exception_instead_of_none():
+    flight = SingleFlight("test")
+
+    def interrupt():
+        raise Interrupted()
+
+    outcomes, _ = run_coalesced(flight, interrupt)
+    assert [kind for kind, _ in outcomes] == ["error"] * 4
+    assert all(isinstance(e, Interrupted) for _, e in outcomes)
+
+
+def test_nothing_is_cached_after_the_call():
+    flight = SingleFlight("test")
+    values = iter([1, 2])
+    assert flight.do("k", lambda: next(values)) == 1
+    assert flight.do("k", lambda: next(values)) == 2
+    with pytest.raises(RuntimeError):
+        flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError()))
+    assert flight.do("k", lambda: 3) == 3
+
+
+def test_request_key_ignores_case_and_whitespace_but_not_history():
+    assert request_key("  I feel   Sad ") == request_key("i feel sad")
+    assert request_key("i feel sad", "User: hi\n") != request_key("i feel sad")
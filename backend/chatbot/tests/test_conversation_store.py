@@ -0,0 +1,119 @@
+import os
+import json
+import threading
+
+import pytest
+
+import conversation_store
+from conversation_store import ConversationLog, load_messages, load_user_messages
+
+
+def msg(role, content):
+    return {"role": role, "content": content}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "conversation.jsonl"), str(tmp_path / "conversation.json")
+
+
+def test_sync_appends_only_new_messages(paths):
+    log_path, legacy = paths
+    chat = [msg("user", "hi"), msg("assistant", "hello")]
+    ConversationLog(log_path, legacy).sync(chat, "a")
+    with open(log_path, "rb") as f:
+        before = f.read()
+
+    chat += [msg("user", "I can't sleep"), msg("assistant", "Try a routine")]
+    ConversationLog(log_path, legacy).sync(chat, "a")
+    with open(log_path, "rb") as f:
+        assert f.read().startswith(before)
+    log = ConversationLog(log_path, legacy)
+    assert log.read() == chat
+    assert log.read(last=1, role="user") == [msg("user", "I can't sleep")]
+    assert len(log) == 4
+
+
+def test_another_chat_or_an_edited_history_rewrites_the_log(paths):
+    log_path, legacy = paths
+    log = ConversationLog(log_path, legacy)
+    log.sync([msg("user", "one"), msg("assistant", "two")], "a")
+    log.sync([msg("user", "other")], "b")
+    assert log.chat_id == "b" and log.read() == [msg("user", "other")]
+    log.sync([msg("user", "edited"), msg("assistant", "x")], "b")
+    assert log.read() == [msg("user", "edited"), msg("assistant", "x")]
+
+
+def test_torn_last_line_is_ignored_and_truncated_on_write(paths):
+    log_path, legacy = paths
+    log = ConversationLog(log_path, legacy)
+    log.sync([msg("user", "hi")], "a")
+    with open(log_path, "ab") as f:
+        f.write(b'{"role": "assistant", "cont')
+    assert log.read() == [msg("user", "hi")]
+
+    log.append([msg("assistant", "hello")])
+    assert log.read() == [msg("user", "hi"), msg("assistant", "hello")]
+    with open(log_path, "rb") as f:
+        lines = f.read().splitlines()
+    assert all(json.loads(line) for line in lines)
+
+
+def test_index_behind_the_log_is_repaired(paths):
+    log_path, legacy = paths
+    log = ConversationLog(log_path, legacy)
+    log.sync([msg("user", "hi")], "a")
+    # A crash between the log write and the index write
+    with open(log_path, "ab") as f:
+        f.write(conversation_store._encode(msg("assistant", "hello")))
+    # and half an index entry from an interrupted write
+    with open(log.index_path, "ab") as f:
+        f.write(b"\x00\x01\x02")
+    assert len(log) == 2
+    assert log.read(role="assistant") == [msg("assistant", "hello")]
+
+    log.sync([msg("user", "hi"), msg("assistant", "hello"), msg("user", "thanks")], "a")
+    assert os.path.getsize(log.index_path) == 3 * conversation_store._ENTRY.size
+    assert log.read(last=2) == [msg("assistant", "hello"), msg("user", "thanks")]
+
+
+def test_legacy_json_is_read_in_place_and_migrated_on_first_append(paths):
+    log_path, legacy = paths
+    with open(legacy, "w", encoding="utf-8") as f:
+        json.dump([msg("user", "old"), msg("assistant", "reply")], f)
+
+    log = ConversationLog(log_path, legacy)
+    assert len(log) == 2
+    assert log.read(role="user") == [msg("user", "old")]
+    assert not os.path.exists(log_path)
+
+    log.append([msg("user", "new")])
+    assert log.chat_id == "legacy"
+    assert [m["content"] for m in log.read()] == ["old", "reply", "new"]
+
+
+def test_concurrent_writers_do_not_interleave(paths):
+    log_path, legacy = paths
+    chat = [msg("user" if i % 2 == 0 else "assistant", f"m{i}") for i in range(40)]
+
+    def save(n):
+        ConversationLog(log_path, legacy).sync(chat[:n], "a")
+
+    threads = [threading.Thread(target=save, args=(n,)) for n in range(20, 41, 2) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    log = ConversationLog(log_path, legacy)
+    messages = log.read()
+    assert messages == chat[:len(messages)]
+    assert os.path.getsize(log.index_path) == len(messages) * conversation_store._ENTRY.size
+
+
+def test_load_helpers_read_both_formats(paths):
+    log_path, legacy = paths
+    with open(legacy, "w", encoding="utf-8") as f:
+        json.dump([msg("user", "a"), msg("assistant", "b"), msg("user", "c")], f)
+    assert load_messages(legacy, last=1, role="user") == [msg("user", "c")]
+    ConversationLog(log_path, legacy_path=None).sync([msg("user", "x"), msg("assistant", "y")], "a")
+    assert load_user_messages(log_path) == ["x"]
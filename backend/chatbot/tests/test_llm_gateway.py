@@ -0,0 +1,167 @@
+import time
+import threading
+
+import pytest
+
+import llm_gateway
+from llm_gateway import AdaptiveLimiter, LLMGateway, LLMUnavailable, TokenBucket
+
+
+class RateLimited(Exception):
+    """Looks like a Groq 429 to is_rate_limited()/retry_after_seconds()."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("429")
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+# TokenBucket ---------------------------------------------------------------
+
+def test_bucket_refills_continuously_up_to_one_minute():
+    bucket = TokenBucket(60)
+    bucket.tokens, bucket.updated = 0.0, 100.0
+    bucket.refill(110.0)
+    assert bucket.tokens == pytest.approx(10)
+    bucket.refill(1000.0)
+    assert bucket.tokens == 60
+
+
+def test_bucket_wait_time_and_oversized_requests():
+    bucket = TokenBucket(60)
+    bucket.tokens = 2.0
+    assert bucket.wait_time(1) == 0.0
+    assert bucket.wait_time(5) == pytest.approx(3.0)
+    # More than a minute's worth only needs a full bucket
+    assert bucket.wait_time(600) == pytest.approx(58.0)
+
+
+def test_bucket_take_and_settle():
+    bucket = TokenBucket(1000)
+    bucket.take(300)
+    assert bucket.tokens == 700
+    bucket.settle(300, 100)  # over-estimate is refunded
+    assert bucket.tokens == 900
+    bucket.settle(0, 1200)   # under-estimate goes into debt
+    assert bucket.tokens == -300
+
+
+def test_zero_rate_is_unlimited():
+    bucket = TokenBucket(0)
+    bucket.take(10 ** 6)
+    bucket.refill(time.monotonic() + 60)
+    assert bucket.unlimited
+    assert bucket.wait_time(10 ** 6) == 0.0
+
+
+# AdaptiveLimiter -------------------------------------------------------------
+
+def test_limiter_halves_on_429_and_grows_back_slowly():
+    limiter = AdaptiveLimiter(8, target_latency=1.0, reserved=0)
+    deadline = time.monotonic() + 1
+    assert limiter.acquire(deadline)
+    limiter.release("throttled", 0.1)
+    assert limiter.limit == 4
+    assert limiter.acquire(deadline)
+    limiter.release("ok", 0.1)
+    assert limiter.limit == pytest.approx(4.25)
+    assert limiter.acquire(deadline)
+    limiter.release("ok", 5.0)  # slower than the target
+    assert limiter.limit == pytest.approx(4.25 * 0.9)
+    assert limiter.in_flight == 0
+
+
+def test_limiter_never_drops_below_one():
+    limiter = AdaptiveLimiter(2, target_latency=1.0, reserved=0)
+    for _ in range(5):
+        assert limiter.acquire(time.monotonic() + 1)
+        limiter.release("throttled", 0.1)
+    assert limiter.limit == 1.0
+
+
+def test_limiter_keeps_reserved_slots_for_crisis():
+    limiter = AdaptiveLimiter(3, target_latency=1.0, reserved=1)
+    deadline = time.monotonic() + 0.05
+    assert limiter.acquire(deadline, "chat")
+    assert limiter.acquire(deadline, "chat")
+    assert not limiter.acquire(deadline, "chat")
+    assert limiter.acquire(deadline, "crisis")
+    assert limiter.in_flight == 3
+
+
+def test_limiter_gives_a_freed_slot_to_a_waiting_crisis_call():
+    limiter = AdaptiveLimiter(1, target_latency=1.0, reserved=0)
+    assert limiter.acquire(time.monotonic() + 1, "chat")
+    order = []
+
+    def take(priority, delay):
+        time.sleep(delay)
+        if limiter.acquire(time.monotonic() + 2, priority):
+            order.append(priority)
+            limiter.release("ok", 0.0)
+
+    threads = [threading.Thread(target=take, args=("chat", 0.0)),
+               threading.Thread(target=take, args=("crisis", 0.05))]
+    for t in threads:
+        t.start()
+    time.sleep(0.15)
+    limiter.release("ok", 0.0)
+    for t in threads:
+        t.join(3)
+    assert order == ["crisis", "chat"]
+
+
+# LLMGateway ------------------------------------------------------------------
+
+def test_gateway_retries_a_429_after_retry_after(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "BACKOFF_BASE", 0.01)
+    gateway = LLMGateway("test", rpm=0, tpm=0, max_concurrency=4, deadline=5)
+    attempts = []
+
+    def fn():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RateLimited(retry_after="0.1")
+        return "ok"
+
+    assert gateway.call(fn, est_tokens=10) == "ok"
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.1
+    assert gateway.counts["throttled"] == 1 and gateway.counts["ok"] == 1
+    # Halved by the 429, then +1/limit for the successful retry
+    assert gateway.limiter.limit == pytest.approx(2.5)
+
+
+def test_gateway_gives_up_at_the_deadline_with_retry_after():
+    gateway = LLMGateway("test", rpm=0, tpm=0, max_concurrency=4, deadline=0.2)
+
+    def fn():
+        raise RateLimited(retry_after="30")
+
+    with pytest.raises(LLMUnavailable) as excinfo:
+        gateway.call(fn, est_tokens=10)
+    assert excinfo.value.retry_after == 30
+    assert gateway.counts["gave_up"] == 1
+
+
+def test_gateway_does_not_retry_other_errors():
+    gateway = LLMGateway("test", rpm=0, tpm=0, max_concurrency=4)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        gateway.call(fn, est_tokens=10)
+    assert len(calls) == 1
+
+
+def test_gateway_refuses_when_the_request_budget_runs_out():
+    gateway = LLMGateway("test", rpm=2, tpm=0, max_concurrency=4, deadline=0.1)
+    assert gateway.call(lambda: "ok", 10, priority="crisis") == "ok"
+    # Other classes leave the last request of the budget to crisis calls
+    with pytest.raises(LLMUnavailable):
+        gateway.call(lambda: "ok", 10, priority="chat")
+    assert gateway.call(lambda: "ok", 10, priority="crisis") == "ok"
@@ -0,0 +1,128 @@
+import time
+import threading
+
+import pytest
+
+import llm_gateway
+from llm_gateway import LLMUnavailable, PriorityScheduler, current_priority, priority_scope
+
+
+def soon(seconds=2):
+    return time.monotonic() + seconds
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def queue_waiters(scheduler, classes):
+    """Queues one waiter per class, in order, behind a full scheduler; returns (threads, grant order)."""
+    order, lock = [], threading.Lock()
+
+    def wait(cls):
+        scheduler.acquire(cls, soon())
+        with lock:
+            order.append(cls)
+
+    threads = []
+    for i, cls in enumerate(classes):
+        t = threading.Thread(target=wait, args=(cls,))
+        t.start()
+        threads.append(t)
+        wait_for(lambda: scheduler.queued() == i + 1)
+    return threads, order
+
+
+def test_last_slot_is_reserved_for_crisis():
+    scheduler = PriorityScheduler("test", slots=2, reserved=1)
+    scheduler.acquire("chat", soon())
+    with pytest.raises(LLMUnavailable):
+        scheduler.acquire("chat", time.monotonic() + 0.05)
+    scheduler.acquire("crisis", soon(0.05))
+    assert scheduler.in_use == 2
+    assert scheduler.stats()["counts"]["chat"]["timed_out"] == 1
+
+
+def test_reservation_never_takes_the_only_slot():
+    scheduler = PriorityScheduler("test", slots=1, reserved=1)
+    assert scheduler.reserved == 0
+    scheduler.acquire("background", soon(0.05))
+
+
+def drain(scheduler, order, total):
+    """Releases slots one at a time until every waiter ran; returns the virtual time after each release."""
+    seen = [scheduler._vtime]
+    while len(order) < total:
+        scheduler.release()
+        # Granted waiters leave the queue at once and record themselves shortly after
+        wait_for(lambda: len(order) + scheduler.queued() == total)
+        seen.append(scheduler._vtime)
+    return seen
+
+
+def test_crisis_takes_the_reserved_slot_while_others_queue():
+    scheduler = PriorityScheduler("test", slots=2, reserved=1)
+    scheduler.acquire("chat", soon())
+    threads, order = queue_waiters(scheduler, ["background", "chat"])
+    scheduler.acquire("crisis", time.monotonic() + 0.05)
+    assert scheduler.queued() == 2 and scheduler.in_use == 2
+    drain(scheduler, order, len(threads))
+    for t in threads:
+        t.join(3)
+
+
+def test_shared_slots_go_out_by_weighted_start_tags(monkeypatch):
+    monkeypatch.setitem(llm_gateway.PRIORITY_SHED_DEPTH, "background", 100)
+    scheduler = PriorityScheduler("test", slots=1, reserved=0)
+    scheduler.acquire("chat", soon())
+    threads, order = queue_waiters(scheduler, ["background"] * 4 + ["chat"] * 4)
+    drain(scheduler, order, len(threads))
+    for t in threads:
+        t.join(3)
+    # Chat advances its tag by 1/3 per call, background by 1: chat gets three
+    # grants for each background one while both are waiting
+    assert order == ["background", "chat", "chat", "background", "chat", "chat", "background", "background"]
+
+
+def test_virtual_time_never_moves_back():
+    scheduler = PriorityScheduler("test", slots=2, reserved=1)
+    scheduler.acquire("chat", soon())
+    scheduler.acquire("crisis", soon())
+    # The queued chat call (tag 1/3) is skipped while only the reserved slot is
+    # free, so the third queued crisis call (tag 3/8) is granted before it
+    threads, order = queue_waiters(scheduler, ["chat", "crisis", "crisis", "crisis"])
+    seen = drain(scheduler, order, len(threads))
+    for t in threads:
+        t.join(3)
+    assert order == ["crisis", "crisis", "crisis", "chat"]
+    assert seen == sorted(seen)
+
+
+def test_background_is_shed_when_the_queue_is_deep(monkeypatch):
+    monkeypatch.setitem(llm_gateway.PRIORITY_SHED_DEPTH, "background", 2)
+    scheduler = PriorityScheduler("test", slots=1, reserved=0)
+    scheduler.acquire("chat", soon())
+    threads, _ = queue_waiters(scheduler, ["chat", "chat"])
+    assert scheduler.should_shed("background")
+    assert not scheduler.should_shed("crisis")
+    with pytest.raises(LLMUnavailable):
+        scheduler.acquire("background", soon())
+    assert scheduler.stats()["counts"]["background"]["shed"] == 1
+    for _ in threads:
+        scheduler.release()
+    for t in threads:
+        t.join(3)
+
+
+def test_priority_scope_sets_the_class_for_the_current_context():
+    assert current_priority() == "chat"
+    with priority_scope("crisis"):
+        assert current_priority() == "crisis"
+        with priority_scope("background"):
+            assert current_priority() == "background"
+        assert current_priority() == "crisis"
+    assert current_priority() == "chat"
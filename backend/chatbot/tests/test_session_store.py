@@ -0,0 +1,99 @@
+import pytest
+
+import session_store
+from session_store import MemorySessionBackend, Session, SessionExpired
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = MemorySessionBackend(max_sessions=3, ttl=60)
+    monkeypatch.setattr(session_store, "_backend", backend)
+    return backend
+
+
+def user(text):
+    return {"role": "user", "content": text}
+
+
+def test_sessions_expire_after_the_ttl(clock, backend):
+    backend.put(Session("a"))
+    clock.now += 61
+    assert backend.get("a") is None
+    assert backend.stats()["expired"] == 1
+    with pytest.raises(SessionExpired):
+        session_store.load("a")
+
+
+def test_reading_a_session_refreshes_its_ttl(clock, backend):
+    backend.put(Session("a"))
+    for _ in range(3):
+        clock.now += 40
+        assert backend.get("a") is not None
+
+
+def test_least_recently_used_session_is_evicted(clock, backend):
+    for sid in "abc":
+        backend.put(Session(sid))
+    backend.get("a")
+    backend.put(Session("d"))
+    assert backend.get("b") is None
+    assert {sid for sid in "acd" if backend.get(sid)} == {"a", "c", "d"}
+    assert backend.stats()["evicted"] == 1
+
+
+def test_get_returns_a_copy(clock, backend):
+    backend.put(Session("a", [user("hi")], ["User: hi\n"]))
+    session = backend.get("a")
+    session.messages.append(user("not saved"))
+    assert backend.get("a").messages == [user("hi")]
+
+
+def test_append_extends_the_stored_copy(clock, backend):
+    session_store.save(Session("a", [user("hi")], ["User: hi\n"]))
+    # Two turns in flight on the same session, each loaded before the other saved
+    first, second = session_store.load("a"), session_store.load("a")
+    session_store.append(first, [user("one")], ["User: one\n"])
+    session_store.append(second, [user("two")], ["User: two\n"])
+    stored = session_store.load("a")
+    assert [m["content"] for m in stored.messages] == ["hi", "one", "two"]
+    assert stored.history == "User: hi\nUser: one\nUser: two\n"
+
+
+def test_append_stores_a_new_session(clock, backend):
+    session = session_store.new_session()
+    session_store.append(session, [user("hi")], ["User: hi\n"])
+    assert session_store.load(session.id).messages == [user("hi")]
+
+
+def test_append_does_not_revive_an_expired_copy(clock, backend):
+    backend.put(Session("a", [user("old")], ["User: old\n"]))
+    clock.now += 61
+    session_store.append(Session("a"), [user("new")], ["User: new\n"])
+    assert backend.get("a").messages == [user("new")]
+
+
+def test_oldest_turns_are_dropped(monkeypatch):
+    monkeypatch.setattr(session_store, "SESSION_MAX_MESSAGES", 3)
+    session = Session("a")
+    session.extend([user(str(i)) for i in range(5)], [f"User: {i}\n" for i in range(5)])
+    assert [m["content"] for m in session.messages] == ["2", "3", "4"]
+    assert session.history == "User: 2\nUser: 3\nUser: 4\n"
+
+
+def test_new_sessions_get_distinct_server_ids():
+    assert session_store.new_session().id != session_store.new_session().id
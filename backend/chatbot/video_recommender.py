@@ -1,42 +1,50 @@
 import os
 import json
-from googleapiclient.discovery import build
-from transformers import pipeline
 from dotenv import load_dotenv
 
+import model_registry
+from emotion_detector import detect_emotion_tiered
+
 # 1. Load environment variables
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-# Global clients (Lazy loaded)
-_youtube_client = None
-_emotion_classifier = None
+# Global clients (Lazy loaded). googleapiclient and transformers are imported
+# inside the loaders so importing this module stays cheap.
+def _load_youtube_client():
+    from googleapiclient.discovery import build
+    return build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+
+def _load_emotion_classifier():
+    from transformers import pipeline
+    return pipeline(
+        "text-classification",
+        model="j-hartmann/emotion-english-distilroberta-base",
+        return_all_scores=False
+    )
+
+_youtube_client = model_registry.register("youtube_client", _load_youtube_client)
+_emotion_classifier = model_registry.register("emotion_classifier", _load_emotion_classifier)
 
 def get_youtube_client():
-    global _youtube_client
-    if not _youtube_client:
-        _youtube_client = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
-    return _youtube_client
+    return _youtube_client.get()
 
 def get_emotion_classifier():
-    global _emotion_classifier
-    if not _emotion_classifier:
-        print("Loading emotion model...")
-        _emotion_classifier = pipeline(
-            "text-classification",
-            model="j-hartmann/emotion-english-distilroberta-base",
-            return_all_scores=False
-        )
-    return _emotion_classifier
+    return _emotion_classifier.get()
 
 import re
 
-def detect_emotion(text: str) -> str:
-    """Detects the dominant emotion in the given text."""
+def detect_emotion_model(text: str) -> str:
+    """Detects the dominant emotion with the DistilRoBERTa pipeline only."""
     classifier = get_emotion_classifier()
     result = classifier(text[:500])
     return result[0]["label"].lower()
 
+def detect_emotion(text: str) -> str:
+    """Detects the dominant emotion; confident keyword matches skip the model."""
+    label, _ = detect_emotion_tiered(text, detect_emotion_model)
+    return label
+
 def parse_duration(duration):
     """Parses ISO 8601 duration string to human readable format."""
     match = re.match(r'PT(\d+H)?(\d+M)?(\d+S)?', duration)
@@ -77,33 +85,54 @@ def fetch_youtube_videos(query, max_results=5):
         id=",".join(video_ids)
     ).execute()
 
-    videos = []
-    for item in videos_response.get("items", []):
-        snippet = item["snippet"]
-        content_details = item["contentDetails"]
-        statistics = item["statistics"]
-        
-        video = {
-            "title": snippet["title"],
-            "url": f"https://www.youtube.com/watch?v={item['id']}",
-            "thumbnail": snippet["thumbnails"].get("high", snippet["thumbnails"]["default"])["url"],
-            "channel": snippet["channelTitle"],
-            "views": statistics.get("viewCount", "0"),
-            "duration": parse_duration(content_details["duration"])
-        }
-        videos.append(video)
-    
-    return videos
+    return [format_video(item) for item in videos_response.get("items", [])]
 
-def recommend_videos(conversation):
-    """Recommends videos based on the user conversation emotion."""
+def format_video(item):
+    """Converts a videos.list item into the dict returned to the Node backend."""
+    snippet = item["snippet"]
+    content_details = item["contentDetails"]
+    statistics = item["statistics"]
+
+    return {
+        "title": snippet["title"],
+        "url": f"https://www.youtube.com/watch?v={item['id']}",
+        "thumbnail": snippet["thumbnails"].get("high", snippet["thumbnails"]["default"])["url"],
+        "channel": snippet["channelTitle"],
+        "views": statistics.get("viewCount", "0"),
+        "duration": parse_duration(content_details["duration"])
+    }
+
+def fetch_youtube_videos_concurrent(queries, max_results=5, pages=1, timeout=None):
+    """
+    Runs several search queries (and pages) concurrently over one shared HTTP session.
+    Returns (videos, complete); complete is False when the timeout budget ran out
+    or an upstream call failed, in which case videos holds whatever did arrive.
+    Raises youtube_async.YouTubeUnavailable when nothing arrived.
+    """
+    try:
+        import youtube_async
+        import aiohttp  # noqa: F401
+    except ImportError:
+        # aiohttp not installed: fall back to the blocking client, primary query only
+        return fetch_youtube_videos(queries[0], max_results=max_results), True
+
+    items, complete = youtube_async.fetch_videos_sync(queries, max_results, pages, timeout)
+    videos = [format_video(item) for item in items]
+    return videos[:max_results], complete
+
+def recommend_videos_detailed(conversation, timeout=None, mood=None):
+    """
+    Like recommend_videos, but returns (videos, complete) so callers can flag partial results.
+    Pass mood when the emotion was already detected for this text (the chat pipeline does).
+    """
     user_text = " ".join([m["content"] for m in conversation if m.get("role") == "user"])
     
     if not user_text:
-        return []
+        return [], True
 
     # Detect emotion to make smart recommendations
-    mood = detect_emotion(user_text)
+    if mood is None:
+        mood = detect_emotion(user_text)
     
     # Map mood to search context
     mood_queries = {
@@ -121,24 +150,25 @@ def recommend_videos(conversation):
     query = f"{user_text[:50]} {suffix}"
     
     print(f"Detected Mood: {mood} | Query: {query}")
-    return fetch_youtube_videos(query, max_results=5)
+    return fetch_youtube_videos_concurrent([query], max_results=5, timeout=timeout)
+
+def recommend_videos(conversation, timeout=None):
+    """Recommends videos based on the user conversation emotion."""
+    videos, _ = recommend_videos_detailed(conversation, timeout=timeout)
+    return videos
 
 if __name__ == "__main__":
-    try:
-        with open("conversation.json", "r", encoding="utf-8") as f:
-            conversation = json.load(f)
-            
-        if conversation:
-            print("\nLast 5 messages:")
-            for msg in conversation[-5:]:
-                print(f"{msg['role']}: {msg['content']}")
-
-            recs = recommend_videos(conversation)
-            print("\nRecommended Videos:")
-            for v in recs:
-                print(f"- {v['title']} ({v['url']})")
-        else:
-            print("Conversation empty.")
-            
-    except FileNotFoundError:
-        print("conversation.json not found.")
\ No newline at end of file
+    from conversation_store import ConversationLog
+
+    log = ConversationLog()
+    if len(log):
+        print("\nLast 5 messages:")
+        for msg in log.read(last=5):
+            print(f"{msg['role']}: {msg['content']}")
+
+        recs = recommend_videos(log.read(role="user"))
+        print("\nRecommended Videos:")
+        for v in recs:
+            print(f"- {v['title']} ({v['url']})")
+    else:
+        print("Conversation empty.")
\ No newline at end of file
@@ -1,12 +1,19 @@
 import os
-from flask import Flask, request, jsonify
+from flask import Flask, Blueprint, request, jsonify
 from flask_cors import CORS
-from video_recommender import recommend_videos
+from emotion_detector import tier_stats
+from server_common import add_health_routes, add_memory_routes, add_metrics_routes, add_response_layer, limit_concurrency
+from video_recommender import recommend_videos_detailed
 
-app = Flask(__name__)
-CORS(app)
+# Routes live on a blueprint so inference_server can mount them next to the chat API
+video_bp = Blueprint("videos", __name__)
 
-@app.route('/api/recommend-videos', methods=['POST'])
+@video_bp.route('/api/emotion-stats', methods=['GET'])
+def emotion_stats():
+    return jsonify(tier_stats())
+
+@video_bp.route('/api/recommend-videos', methods=['POST'])
+@limit_concurrency("videos", 4)
 def get_recommendations():
     try:
         data = request.get_json()
@@ -21,18 +28,33 @@ def get_recommendations():
             {"role": "user", "content": user_query}
         ]
 
-        # Call the existing logic
-        videos = recommend_videos(dummy_conversation)
+        # Some videos before the deadline come back as a partial list; none at all raises
+        # YouTubeUnavailable, answered with a 500 so the caller keeps its cached list
+        videos, complete = recommend_videos_detailed(dummy_conversation)
 
         return jsonify({
             "success": True, 
-            "videos": videos
+            "videos": videos,
+            "partial": not complete
         })
 
     except Exception as e:
         print(f"Error in video recommendation API: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+def create_app():
+    """The standalone recommender service; inference_server mounts video_bp instead."""
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(video_bp)
+    # RECOMMENDER_PRELOAD=1 loads the models in the background at boot instead of
+    # on the first request; /api/ready reports 503 until they are in memory.
+    add_health_routes(app, "RECOMMENDER_PRELOAD")
+    add_metrics_routes(app)
+    add_memory_routes(app)
+    add_response_layer(app)
+    return app
+
 if __name__ == "__main__":
     port = int(os.getenv("RECOMMENDER_PORT", 4002))
-    app.run(host="0.0.0.0", port=port)
\ No newline at end of file
+    create_app().run(host="0.0.0.0", port=port)
\ No newline at end of file
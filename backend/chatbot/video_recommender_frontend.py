@@ -1,28 +1,23 @@
-import json
 import streamlit as st
+from conversation_store import ConversationLog
 from video_recommender import recommend_videos
 
 def main():
     st.title("Video Recommender")
 
-    try:
-        with open("conversation.json", "r", encoding="utf-8") as f:
-            conversation = json.load(f)
-    except FileNotFoundError:
-        conversation = []
-
-    if not conversation:
+    log = ConversationLog()
+    if not len(log):
         st.warning("No chatbot conversation found yet.")
         return
 
     st.subheader("Recent Conversation")
-    for msg in conversation[-5:]:
+    for msg in log.read(last=5):
         role = "User" if msg["role"] == "user" else "Welli-Bot"
         st.markdown(f"**{role}:** {msg['content']}")
 
     # Use the shared logic from video_recommender.py
     with st.spinner('Analyzing emotion and finding videos...'):
-        recs = recommend_videos(conversation)
+        recs = recommend_videos(log.read(role="user"))
 
     if recs:
         st.subheader("Recommended YouTube Videos:")
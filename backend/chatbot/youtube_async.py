@@ -0,0 +1,230 @@
+import os
+import time
+import asyncio
+from threading import Lock, Thread
+from dotenv import load_dotenv
+
+load_dotenv()
+YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3"
+
+# Overall budget for one recommendation fetch (searches + details), in seconds
+FETCH_TIMEOUT = float(os.getenv("YOUTUBE_FETCH_TIMEOUT", 8))
+# How long fetched video details are reused before hitting the API again
+DETAILS_TTL = float(os.getenv("YOUTUBE_DETAILS_TTL", 600))
+DETAILS_CACHE_SIZE = 2048
+# Share of the budget searches may use; the rest is kept for the details call
+SEARCH_BUDGET_SHARE = 0.6
+
+class YouTubeUnavailable(RuntimeError):
+    """No videos could be fetched: every search failed or the budget ran out first."""
+
+
+# One event loop thread and one HTTP session shared by every Flask worker thread
+_loop_lock = Lock()
+_loop = None
+_session = None
+
+# Video details keyed by id: finished results and fetches still in flight
+_details_cache = {}
+_details_inflight = {}
+
+
+def _run_loop(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_loop():
+    """Starts (once) the background event loop that owns the shared session."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            Thread(target=_run_loop, args=(loop,), name="youtube-async", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+async def _get_session():
+    global _session
+    if _session is None or _session.closed:
+        import aiohttp
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT),
+        )
+    return _session
+
+
+async def _get_json(path, params):
+    session = await _get_session()
+    params = dict(params, key=YOUTUBE_API_KEY or "")
+    async with session.get(f"{YOUTUBE_API_URL}/{path}", params=params) as resp:
+        resp.raise_for_status()
+        return await resp.json()
+
+
+async def search(query, max_results=5, page_token=None):
+    """Returns (video_ids, next_page_token) for one search results page."""
+    params = {
+        "q": query,
+        "part": "snippet",
+        "type": "video",
+        "maxResults": max_results,
+        "videoEmbeddable": "true",
+        "safeSearch": "strict",
+    }
+    if page_token:
+        params["pageToken"] = page_token
+    data = await _get_json("search", params)
+    ids = [item["id"]["videoId"] for item in data.get("items", [])]
+    return ids, data.get("nextPageToken")
+
+
+async def _search_pages(query, max_results, pages):
+    ids, token = [], None
+    for _ in range(pages):
+        page_ids, token = await search(query, max_results, token)
+        ids.extend(page_ids)
+        if not token:
+            break
+    return ids
+
+
+async def _fetch_details_batch(ids, futures):
+    try:
+        data = await _get_json("videos", {
+            "part": "snippet,contentDetails,statistics",
+            "id": ",".join(ids),
+        })
+        found = {item["id"]: item for item in data.get("items", [])}
+        now = time.monotonic()
+        for vid in ids:
+            item = found.get(vid)
+            if item is not None:
+                _details_cache[vid] = (now, item)
+            futures[vid].set_result(item)
+        while len(_details_cache) > DETAILS_CACHE_SIZE:
+            _details_cache.pop(next(iter(_details_cache)))
+    except BaseException as e:
+        for vid in ids:
+            if not futures[vid].done():
+                futures[vid].set_exception(e)
+        raise
+    finally:
+        for vid in ids:
+            _details_inflight.pop(vid, None)
+
+
+async def get_details(video_ids, details=None):
+    """
+    Returns {video_id: item} for the given ids.
+    Ids already cached or being fetched by another request are not requested again.
+    Items are added to `details` as they arrive, so a caller that times out keeps them.
+    """
+    loop = asyncio.get_running_loop()
+    now = time.monotonic()
+    waiting, missing = {}, []
+    for vid in dict.fromkeys(video_ids):
+        cached = _details_cache.get(vid)
+        if cached and now - cached[0] < DETAILS_TTL:
+            waiting[vid] = loop.create_future()
+            waiting[vid].set_result(cached[1])
+        elif vid in _details_inflight:
+            waiting[vid] = _details_inflight[vid]
+        else:
+            missing.append(vid)
+
+    if missing:
+        futures = {vid: loop.create_future() for vid in missing}
+        _details_inflight.update(futures)
+        waiting.update(futures)
+        # videos.list accepts at most 50 ids per call
+        for i in range(0, len(missing), 50):
+            batch = missing[i:i + 50]
+            task = loop.create_task(_fetch_details_batch(batch, futures))
+            # Errors are delivered through the futures; keep the task from warning
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    details = {} if details is None else details
+    for vid, fut in waiting.items():
+        try:
+            # shield: a caller timing out must not cancel a fetch others wait on
+            item = await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            continue
+        if item is not None:
+            details[vid] = item
+    return details
+
+
+async def fetch_videos(queries, max_results=5, pages=1, timeout=None):
+    """
+    Runs all searches concurrently, then fetches details for the union of results.
+    Returns (items, complete); on timeout or upstream errors the items gathered
+    so far are returned with complete=False. Raises YouTubeUnavailable when
+    nothing arrived because of an error or timeout (a bad API key, quota), so
+    callers can tell a failure from a search with no results.
+    """
+    budget = FETCH_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + budget
+    complete = True
+
+    tasks = [asyncio.ensure_future(_search_pages(q, max_results, pages)) for q in queries]
+    done, pending = await asyncio.wait(tasks, timeout=budget * SEARCH_BUDGET_SHARE)
+    errors = []
+    for task in pending:
+        task.cancel()
+        complete = False
+        errors.append("search timed out")
+
+    # Keep query order so the primary query's results come first
+    video_ids = []
+    for task in tasks:
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            print(f"YouTube search failed: {task.exception()!r}")
+            complete = False
+            errors.append(repr(task.exception()))
+            continue
+        video_ids.extend(task.result())
+    video_ids = list(dict.fromkeys(video_ids))
+    if not video_ids:
+        if errors:
+            raise YouTubeUnavailable("; ".join(errors))
+        return [], complete
+
+    details = {}
+    try:
+        await asyncio.wait_for(get_details(video_ids, details), max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        print("YouTube details fetch timed out")
+
+    if not details:
+        raise YouTubeUnavailable("no video details before the deadline")
+    if len(details) < len(video_ids):
+        complete = False
+    return [details[vid] for vid in video_ids if vid in details], complete
+
+
+def fetch_videos_sync(queries, max_results=5, pages=1, timeout=None):
+    """
+    Blocking entry point for Flask threads; runs fetch_videos on the shared loop.
+    Raises YouTubeUnavailable instead of returning an empty list on failure.
+    """
+    budget = FETCH_TIMEOUT if timeout is None else timeout
+    future = asyncio.run_coroutine_threadsafe(
+        fetch_videos(queries, max_results, pages, budget), get_loop())
+    try:
+        # fetch_videos enforces the budget itself; the margin only guards a stuck loop
+        return future.result(budget + 1)
+    except YouTubeUnavailable:
+        raise
+    except Exception as e:
+        future.cancel()
+        print(f"YouTube async fetch failed: {e!r}")
+        raise YouTubeUnavailable(repr(e)) from e
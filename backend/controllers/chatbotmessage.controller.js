@@ -33,6 +33,11 @@ const createChatbotMessage = asyncHandler(async (req, res) => {
             history: history
         })
     })
+    if(response.status === 503) {
+        // The chatbot is throttled by its LLM provider; let the client retry
+        res.set("Retry-After", response.headers.get("Retry-After") || "5")
+        throw new ApiError(503, "Chatbot is busy, please retry")
+    }
     if(!response.ok) {
         throw new ApiError(500, "Failed to fetch response from chatbot service")
     }
@@ -229,6 +229,47 @@ const currentUser = asyncHandler(async (req, res) => {
     return res.status(200).json(new ApiResponse(200, user, "Fetched current user"))
 })
 
+// Returns { relevant, videos, partial }, or null when the services failed.
+// With CHATBOT_API_HOST and VIDEO_RECOMMENDER_API_HOST on the same unified
+// inference server, relevance and videos come from one /api/chat/pipeline call;
+// in the split deployment the recommender service is called as before, so the
+// chat service never loads the emotion model or the YouTube client.
+const fetchRecommendations = async (userQuery) => {
+    const chatbotHost = process.env.CHATBOT_API_HOST;
+    const recommenderHost = process.env.VIDEO_RECOMMENDER_API_HOST || chatbotHost;
+    const post = (url, body) => fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+    });
+
+    try {
+        if (recommenderHost === chatbotHost) {
+            const resp = await post(`${chatbotHost}/api/chat/pipeline`, { message: userQuery, reply: false, scales: false, videos: true });
+            if (!resp.ok) return null;
+            const data = await resp.json();
+            if (!data.relevant) return { relevant: false, videos: [], partial: false };
+            if (!Array.isArray(data.videos)) return null;
+            return { relevant: true, videos: data.videos, partial: Boolean(data.partial) };
+        }
+
+        const relevanceResponse = await post(`${chatbotHost}/api/chat/check-relevance`, { message: userQuery });
+        if (!relevanceResponse.ok) return null;
+        const relevanceData = await relevanceResponse.json();
+        if (!(relevanceData.reply && relevanceData.reply.includes('yes'))) {
+            return { relevant: false, videos: [], partial: false };
+        }
+
+        const resp = await post(`${recommenderHost}/api/recommend-videos`, { userQuery: userQuery });
+        const data = await resp.json();
+        if (!resp.ok || !data.success || !Array.isArray(data.videos)) return null;
+        return { relevant: true, videos: data.videos, partial: Boolean(data.partial) };
+    } catch (error) {
+        console.error("Video recommendation request failed:", error);
+        return null;
+    }
+}
+
 const videoRecommendation = asyncHandler(async (req, res) => {
     const user = await User.findById(req.user._id);
     
@@ -263,39 +304,25 @@ const videoRecommendation = asyncHandler(async (req, res) => {
         return res.status(200).json(new ApiResponse(200, user.recommendations || [], "No recent chat history to generate new recommendations"));
     }
     
-    // 3. Check relevance
-    const relevanceResponse = await fetch(`${process.env.CHATBOT_API_HOST}/api/chat/check-relevance`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ message: userQuery })
-    });
-    
-    const relevanceData = await relevanceResponse.json();
-    const isRelevant = relevanceData.reply && relevanceData.reply.includes('yes');
-    
-    if (!isRelevant) {
-        return res.status(200).json(new ApiResponse(200, user.recommendations || [], "Query not relevant to mental health, returning cached/empty"));
-    }
+    // 3. Relevance check and recommendations
+    const result = await fetchRecommendations(userQuery);
 
-    // 4. Fetch recommendations
-    const pythonApiUrl = `${process.env.VIDEO_RECOMMENDER_API_HOST}/api/recommend-videos`;
+    if (!result) {
+        return res.status(200).json(new ApiResponse(200, user.recommendations || [], "Failed to fetch new recommendations, returning cached"));
+    }
 
-    const resp = await fetch(pythonApiUrl, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({ userQuery: userQuery })
-    });
+    if (!result.relevant) {
+        return res.status(200).json(new ApiResponse(200, user.recommendations || [], "Query not relevant to mental health, returning cached/empty"));
+    }
 
-    const data = await resp.json();
-    
-    if (!data.success) {
-        return res.status(200).json(new ApiResponse(200, user.recommendations || [], "Failed to fetch new recommendations, returning cached"));
+    // A partial or empty list (YouTube timed out) doesn't replace the cached one
+    if (result.partial || result.videos.length === 0) {
+        const hasCached = user.recommendations && user.recommendations.length > 0;
+        return res.status(200).json(new ApiResponse(200, hasCached ? user.recommendations : result.videos, "Incomplete recommendations, returning cached"));
     }
 
-    // 5. Update user model
-    const newRecommendations = data.videos.map(v => ({
+    // 4. Update user model
+    const newRecommendations = result.videos.map(v => ({
         title: v.title,
         thumbnail: v.thumbnail,
         url: v.url,